@@ -5,16 +5,25 @@ with optional Duo push notification approval for high-risk actions.
 """
 
 import asyncio
+import functools
 import logging
 import secrets
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
 from datetime import datetime, timedelta
 from typing import Literal
 
+try:
+    import duo_client
+except ImportError:  # Optional dependency, only needed when Duo MFA is configured
+    duo_client = None
+
 logger = logging.getLogger(__name__)
 
 
-@dataclass
+@dataclass(slots=True)
 class PendingAction:
     """A pending action awaiting user confirmation."""
     action_id: str
@@ -29,7 +38,9 @@ class PendingAction:
     impact: str
     created_at: datetime
     expires_at: datetime
+    expires_at_ns: int  # time.monotonic_ns() deadline used for expiry checks
     confirm_token: str | None = None
+    confirming: bool = False  # Set while confirm() awaits the Duo push
     duo_approved: bool = False
     duo_txid: str | None = None
 
@@ -43,6 +54,7 @@ class DuoAuthClient:
         secret_key: str,
         api_host: str,
         mfa_user: str,
+        pool_size: int = 8,
     ):
         """Initialize Duo client.
 
@@ -51,28 +63,45 @@ class DuoAuthClient:
             secret_key: Duo Auth API secret key (skey)
             api_host: Duo API hostname (e.g., api-XXXXXXXX.duosecurity.com)
             mfa_user: User identifier for push notifications (e.g., jon@freed.dev)
+            pool_size: Worker threads for blocking Duo API calls
         """
         self.integration_key = integration_key
         self.secret_key = secret_key
         self.api_host = api_host
         self.mfa_user = mfa_user
         self._client = None
+        # Push approvals block for up to a minute; keep them off the default
+        # executor. Created on first use and shut down by close()
+        self._pool_size = pool_size
+        self._executor: ThreadPoolExecutor | None = None
+        if duo_client is not None:
+            self._client = duo_client.Auth(
+                ikey=integration_key,
+                skey=secret_key,
+                host=api_host,
+            )
 
-    async def _get_client(self):
-        """Get or create the Duo Admin client."""
+    def _get_client(self):
+        """Get the Duo Auth client."""
         if self._client is None:
-            try:
-                import duo_client
-                self._client = duo_client.Auth(
-                    ikey=self.integration_key,
-                    skey=self.secret_key,
-                    host=self.api_host,
-                )
-            except ImportError:
-                logger.error("duo_client package not installed")
-                raise RuntimeError("Duo client not available - install duo_client package")
+            logger.error("duo_client package not installed")
+            raise RuntimeError("Duo client not available - install duo_client package")
         return self._client
 
+    def _get_executor(self) -> ThreadPoolExecutor:
+        """Get the worker pool for blocking Duo API calls, creating it if needed."""
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self._pool_size, thread_name_prefix="duo"
+            )
+        return self._executor
+
+    def close(self) -> None:
+        """Shut down the worker pool, abandoning queued calls."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
     async def send_push(self, description: str, action_id: str) -> tuple[bool, str | None]:
         """Send a Duo push notification and wait for response.
 
@@ -84,25 +113,23 @@ class DuoAuthClient:
             Tuple of (approved: bool, txid: str | None)
         """
         try:
-            client = await self._get_client()
+            client = self._get_client()
 
             # Run Duo API call in thread pool since it's blocking
-            loop = asyncio.get_event_loop()
-
-            # First, initiate the push
-            def auth_push():
-                return client.auth(
-                    factor="push",
-                    username=self.mfa_user,
-                    device="auto",
-                    type="UniFi Admin Action",
-                    display_username=self.mfa_user,
-                    pushinfo=f"Action={description}&ID={action_id}",
-                    async_txn=False,  # Wait for response
-                )
+            loop = asyncio.get_running_loop()
+            auth_push = functools.partial(
+                client.auth,
+                factor="push",
+                username=self.mfa_user,
+                device="auto",
+                type="UniFi Admin Action",
+                display_username=self.mfa_user,
+                pushinfo=f"Action={description}&ID={action_id}",
+                async_txn=False,  # Wait for response
+            )
 
             logger.info(f"Sending Duo push to {self.mfa_user} for: {description}")
-            result = await loop.run_in_executor(None, auth_push)
+            result = await loop.run_in_executor(self._get_executor(), auth_push)
 
             if result.get("result") == "allow":
                 logger.info(f"Duo push approved for action {action_id}")
@@ -126,13 +153,9 @@ class DuoAuthClient:
             True if approved, False otherwise
         """
         try:
-            client = await self._get_client()
-            loop = asyncio.get_event_loop()
-
-            def check():
-                return client.auth_status(txid)
-
-            result = await loop.run_in_executor(None, check)
+            client = self._get_client()
+            loop = asyncio.get_running_loop()
+            result = await loop.run_in_executor(self._get_executor(), client.auth_status, txid)
             return result.get("result") == "allow"
         except Exception as e:
             logger.error(f"Duo status check error: {e}")
@@ -146,16 +169,62 @@ class ConfirmationStore:
         self,
         ttl_minutes: int = 5,
         duo_client: DuoAuthClient | None = None,
+        max_size: int = 10_000,
     ):
         """Initialize the confirmation store.
 
         Args:
             ttl_minutes: Time-to-live for pending actions in minutes
             duo_client: Optional Duo client for MFA on dangerous+ actions
+            max_size: Maximum pending actions; the oldest is evicted beyond this
         """
-        self._actions: dict[str, PendingAction] = {}
+        # Insertion-ordered so the oldest action can be evicted in O(1). Every
+        # action gets the same TTL, so this is also expiry order
+        self._actions: OrderedDict[str, PendingAction] = OrderedDict()
+        self._tokens: dict[str, str] = {}  # confirm_token -> action_id
         self.ttl = timedelta(minutes=ttl_minutes)
+        self._ttl_ns = ttl_minutes * 60 * 1_000_000_000
         self.duo_client = duo_client
+        self.max_size = max_size
+        self._sweep_interval_s = 30.0  # Background eviction period
+        self._sweep_task: asyncio.Task | None = None
+
+    async def start(self) -> None:
+        """Start the background task that evicts expired actions."""
+        if self._sweep_task is None:
+            self._sweep_task = asyncio.create_task(self._periodic_sweep())
+
+    async def stop(self) -> None:
+        """Stop the background eviction task and the Duo worker pool."""
+        if self._sweep_task:
+            self._sweep_task.cancel()
+            try:
+                await self._sweep_task
+            except asyncio.CancelledError:
+                pass
+            self._sweep_task = None
+        if self.duo_client:
+            self.duo_client.close()
+
+    async def _periodic_sweep(self) -> None:
+        """Evict expired actions every sweep interval."""
+        while True:
+            await asyncio.sleep(self._sweep_interval_s)
+            self.cleanup_expired()
+
+    def _remove(self, action_id: str) -> PendingAction | None:
+        """Remove an action and its confirmation token index entry.
+
+        Args:
+            action_id: The action ID to remove
+
+        Returns:
+            The removed PendingAction or None if not found
+        """
+        action = self._actions.pop(action_id, None)
+        if action and action.confirm_token:
+            self._tokens.pop(action.confirm_token, None)
+        return action
 
     def requires_duo(self, risk_level: str) -> bool:
         """Check if an action requires Duo MFA.
@@ -197,11 +266,17 @@ class ConfirmationStore:
         Returns:
             The created PendingAction
         """
-        # Cleanup expired actions first
-        self.cleanup_expired()
+        if len(self._actions) >= self.max_size:
+            # Under pressure, sweep now rather than waiting for the next interval
+            self.cleanup_expired()
+            while len(self._actions) >= self.max_size:
+                oldest_id = next(iter(self._actions))
+                self._remove(oldest_id)
+                logger.warning(f"Confirmation store full, evicted action {oldest_id}")
 
         action_id = secrets.token_urlsafe(16)
         now = datetime.utcnow()
+        now_ns = time.monotonic_ns()
 
         action = PendingAction(
             action_id=action_id,
@@ -216,6 +291,7 @@ class ConfirmationStore:
             impact=impact,
             created_at=now,
             expires_at=now + self.ttl,
+            expires_at_ns=now_ns + self._ttl_ns,
         )
 
         self._actions[action_id] = action
@@ -232,9 +308,11 @@ class ConfirmationStore:
         Returns:
             The PendingAction or None if not found/expired
         """
+        if not self._actions:
+            return None
         action = self._actions.get(action_id)
-        if action and datetime.utcnow() > action.expires_at:
-            del self._actions[action_id]
+        if action and time.monotonic_ns() > action.expires_at_ns:
+            self._remove(action_id)
             return None
         return action
 
@@ -267,14 +345,21 @@ class ConfirmationStore:
         if action.confirm_token:
             return None, "Action already confirmed."
 
+        if action.confirming:
+            return None, "Action is already being confirmed."
+
         # Check if Duo MFA is required
         if self.requires_duo(action.risk_level):
             logger.info(f"Action {action_id} requires Duo MFA")
 
-            approved, txid = await self.duo_client.send_push(
-                description=action.description,
-                action_id=action_id,
-            )
+            action.confirming = True
+            try:
+                approved, txid = await self.duo_client.send_push(
+                    description=action.description,
+                    action_id=action_id,
+                )
+            finally:
+                action.confirming = False
 
             if not approved:
                 return None, "Duo MFA verification failed or was denied."
@@ -282,8 +367,14 @@ class ConfirmationStore:
             action.duo_approved = True
             action.duo_txid = txid
 
+            # The action may have been denied, expired or confirmed by another
+            # caller while the push was pending
+            if self._actions.get(action_id) is not action or action.confirm_token:
+                return None, "Action expired or was already handled."
+
         # Generate confirmation token
         action.confirm_token = secrets.token_urlsafe(32)
+        self._tokens[action.confirm_token] = action_id
         logger.info(f"Action {action_id} confirmed, token generated")
 
         return action.confirm_token, None
@@ -298,31 +389,64 @@ class ConfirmationStore:
         Returns:
             The tool_args dict if valid, None otherwise
         """
-        for action_id, action in list(self._actions.items()):
-            if action.confirm_token == token and action.tool_name == tool_name:
-                # Consume the token by removing the action
-                tool_args = action.tool_args.copy()
-                del self._actions[action_id]
-                logger.info(f"Token validated and consumed for action {action_id}")
-                return tool_args
+        action_id = self._tokens.get(token)
+        action = self._actions.get(action_id) if action_id else None
+        if action and time.monotonic_ns() > action.expires_at_ns:
+            # Expired but not yet swept: the token must not be redeemable
+            self._remove(action_id)
+            action = None
+        if action and action.tool_name == tool_name:
+            # Consume the token by removing the action
+            self._remove(action_id)
+            logger.info(f"Token validated and consumed for action {action_id}")
+            return action.tool_args.copy()
 
         logger.warning(f"Invalid token for tool {tool_name}")
         return None
 
-    def deny(self, action_id: str) -> bool:
+    async def validate_token_async(self, tool_name: str, token: str) -> dict | None:
+        """Validate and consume a confirmation token from async code.
+
+        The in-memory lookup is O(1), so it runs inline rather than through
+        asyncio.to_thread. A store backed by Redis or a database would
+        override this with real async I/O.
+
+        Args:
+            tool_name: The tool name the token should be for
+            token: The confirmation token
+
+        Returns:
+            The tool_args dict if valid, None otherwise
+        """
+        return self.validate_token(tool_name, token)
+
+    def deny(self, action_id: str) -> PendingAction | None:
         """Deny/cancel a pending action.
 
         Args:
             action_id: The action ID to deny
 
         Returns:
-            True if action was found and removed
+            The removed PendingAction, or None if not found or already expired
         """
-        if action_id in self._actions:
-            del self._actions[action_id]
+        action = self.pop(action_id)
+        if action:
             logger.info(f"Action {action_id} denied/cancelled")
-            return True
-        return False
+        return action
+
+    def pop(self, action_id: str) -> PendingAction | None:
+        """Remove a pending action and return it, in one lookup.
+
+        Args:
+            action_id: The action ID to remove
+
+        Returns:
+            The removed PendingAction, or None if not found or already expired
+        """
+        action = self._remove(action_id)
+        if action and time.monotonic_ns() > action.expires_at_ns:
+            return None
+        return action
 
     def cleanup_expired(self) -> int:
         """Remove expired actions.
@@ -330,20 +454,23 @@ class ConfirmationStore:
         Returns:
             Number of actions removed
         """
-        now = datetime.utcnow()
-        expired = [
-            action_id
-            for action_id, action in self._actions.items()
-            if action.expires_at < now
-        ]
+        if not self._actions:
+            return 0
+        now = time.monotonic_ns()
 
-        for action_id in expired:
-            del self._actions[action_id]
+        # Expired actions are always at the head, so stop at the first live one
+        removed = 0
+        while self._actions:
+            action_id, action = next(iter(self._actions.items()))
+            if action.expires_at_ns >= now:
+                break
+            self._remove(action_id)
+            removed += 1
 
-        if expired:
-            logger.debug(f"Cleaned up {len(expired)} expired actions")
+        if removed:
+            logger.debug(f"Cleaned up {removed} expired actions")
 
-        return len(expired)
+        return removed
 
     def list_pending(self, user_id: str | None = None) -> list[PendingAction]:
         """List pending actions, optionally filtered by user.
@@ -354,9 +481,12 @@ class ConfirmationStore:
         Returns:
             List of pending actions
         """
+        if not self._actions:
+            return []
         self.cleanup_expired()
 
-        actions = list(self._actions.values())
+        now = time.monotonic_ns()
+        actions = [a for a in self._actions.values() if a.expires_at_ns >= now]
         if user_id:
             actions = [a for a in actions if a.user_id == user_id]
 
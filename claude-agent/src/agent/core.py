@@ -5,17 +5,83 @@ with tool use capabilities, providing a simpler alternative to the full
 Claude Agent SDK while maintaining the same functionality.
 """
 
+import asyncio
 import json
 import logging
+import time
+from collections.abc import Awaitable, Callable
+from typing import Any
 
 import httpx
 
 from ..config import settings
-from .prompts import AUDIT_ANALYSIS_PROMPT, HEALTH_ANALYSIS_PROMPT, UNIFI_EXPERT_SYSTEM_PROMPT
-from .tools import TOOL_DEFINITIONS, ConfirmationRequired
+from .prompts import (
+    UNIFI_EXPERT_SYSTEM_PROMPT,
+    build_knowledge_preamble,
+    render_audit_prompt,
+    render_health_prompt,
+)
+from .tools import TOOL_BY_NAME, TOOL_DEFINITIONS, ConfirmationRequired
 
 logger = logging.getLogger(__name__)
 
+# Shared Anthropic API client so every query reuses one connection pool
+_http_client: httpx.AsyncClient | None = None
+
+# One-hour prompt cache; refreshed by the optional heartbeat while in use
+_CACHE_CONTROL = {"type": "ephemeral", "ttl": "1h"}
+_CACHE_TTL_SECONDS = 3600
+
+# Output token limit for query turns
+_MAX_TOKENS = 4096
+
+# Tool results kept verbatim in the message history; older ones are elided
+_MAX_TOOL_RESULTS = 12
+_PRUNED_TOOL_RESULT = "[Older tool result omitted to save context]"
+
+
+def _format_health_prompt(devices: list[dict], summary: str) -> str:
+    """Render the health analysis prompt (run in a worker thread)."""
+    return render_health_prompt(json.dumps(devices, indent=2), summary)
+
+
+def _format_audit_prompt(
+    findings: list[dict],
+    network_count: int,
+    wlan_count: int,
+    firewall_count: int,
+    device_count: int,
+) -> str:
+    """Render the audit analysis prompt (run in a worker thread)."""
+    return render_audit_prompt(
+        json.dumps(findings, indent=2),
+        network_count,
+        wlan_count,
+        firewall_count,
+        device_count,
+    )
+
+
+def _prune_tool_results(messages: list[dict], keep: int = _MAX_TOOL_RESULTS) -> None:
+    """Elide all but the newest ``keep`` tool results in place.
+
+    The tool_result blocks stay (the API requires one per tool_use), only
+    their content is replaced, so each turn re-sends a bounded history.
+
+    Args:
+        messages: Conversation messages, oldest first
+        keep: Number of most recent tool results to keep
+    """
+    results = [
+        block
+        for message in messages
+        if message["role"] == "user" and isinstance(message["content"], list)
+        for block in message["content"]
+        if block.get("type") == "tool_result"
+    ]
+    for block in results[:-keep] if keep else results:
+        block["content"] = _PRUNED_TOOL_RESULT
+
 
 class UniFiExpertAgent:
     """UniFi Network Expert Agent using Claude API with tool use."""
@@ -30,26 +96,110 @@ class UniFiExpertAgent:
         self.api_key = settings.ANTHROPIC_API_KEY
         self.model = "claude-sonnet-4-20250514"
         self.api_url = "https://api.anthropic.com/v1/messages"
-        self._client: httpx.AsyncClient | None = None
+
+        # Static request fields (including the large system prompt and tool
+        # schemas), serialized once and shared by every request
+        self._static_body_json = json.dumps({
+            "model": self.model,
+            "system": self._build_system(),
+            "tools": self._build_tools(),
+        })
+        self._last_query = 0.0
+        self._heartbeat_task: asyncio.Task | None = None
 
     async def _get_client(self) -> httpx.AsyncClient:
-        """Get or create HTTP client."""
-        if self._client is None:
-            self._client = httpx.AsyncClient(
+        """Get or create the shared HTTP/2 client for the Anthropic API."""
+        global _http_client
+        if _http_client is None:
+            _http_client = httpx.AsyncClient(
+                http2=True,
+                limits=httpx.Limits(
+                    max_connections=100,
+                    max_keepalive_connections=20,
+                    keepalive_expiry=60.0,
+                ),
                 headers={
                     "x-api-key": self.api_key,
                     "anthropic-version": "2023-06-01",
                     "content-type": "application/json",
                 },
-                timeout=120.0,
+                timeout=httpx.Timeout(connect=10.0, read=120.0, write=30.0, pool=5.0),
             )
-        return self._client
+        return _http_client
+
+    async def start_cache_heartbeat(self) -> None:
+        """Start the background task that keeps the prompt cache warm."""
+        if self._heartbeat_task is None:
+            self._heartbeat_task = asyncio.create_task(self._cache_heartbeat())
+
+    async def _cache_heartbeat(self) -> None:
+        """Refresh the cached prefix while the agent has been used recently."""
+        interval = settings.PROMPT_CACHE_HEARTBEAT_MINUTES * 60
+        while True:
+            await asyncio.sleep(interval)
+            # Only keep the cache alive for an active session
+            if time.monotonic() - self._last_query > _CACHE_TTL_SECONDS:
+                continue
+            try:
+                await self.warm_cache()
+            except Exception as e:
+                logger.warning(f"Prompt cache heartbeat failed: {e}")
+
+    def _encode_body(self, **fields: Any) -> bytes:
+        """Encode a request body, splicing per-request fields onto the static JSON.
+
+        Args:
+            **fields: Per-request fields such as messages and max_tokens
+
+        Returns:
+            JSON request body
+        """
+        return f"{self._static_body_json[:-1]}, {json.dumps(fields)[1:]}".encode()
+
+    async def warm_cache(self) -> None:
+        """Send a minimal request that reads (and so refreshes) the cached prefix."""
+        client = await self._get_client()
+        body = self._encode_body(
+            max_tokens=1,
+            messages=[{"role": "user", "content": "ping"}],
+        )
+        response = await client.post(self.api_url, content=body)
+        response.raise_for_status()
+        logger.debug("Prompt cache refreshed")
 
     async def close(self):
-        """Close the HTTP client."""
-        if self._client:
-            await self._client.aclose()
-            self._client = None
+        """Stop the cache heartbeat and close the HTTP client."""
+        if self._heartbeat_task:
+            self._heartbeat_task.cancel()
+            try:
+                await self._heartbeat_task
+            except asyncio.CancelledError:
+                pass
+            self._heartbeat_task = None
+
+        global _http_client
+        if _http_client:
+            await _http_client.aclose()
+            _http_client = None
+
+    def _build_system(self) -> list[dict]:
+        """Build the static system blocks, with reference docs folded in.
+
+        The last block carries the cache breakpoint; tools precede the system
+        prompt in the cached prefix, so everything here is reused across turns.
+        """
+        blocks = [{"type": "text", "text": UNIFI_EXPERT_SYSTEM_PROMPT}]
+
+        if self.knowledge_base is not None:
+            preamble = build_knowledge_preamble(
+                self.knowledge_base.knowledge_dir,
+                settings.PROMPT_KNOWLEDGE_MAX_CHARS,
+            )
+            if preamble:
+                blocks.append({"type": "text", "text": preamble})
+
+        blocks[-1]["cache_control"] = _CACHE_CONTROL
+        return blocks
 
     def _build_tools(self) -> list[dict]:
         """Build tool definitions for Claude API."""
@@ -78,38 +228,140 @@ class UniFiExpertAgent:
             }
             tools.append(tool)
 
+        # Cache breakpoint on the last tool so the tool definitions form their
+        # own cached prefix ahead of the system prompt
+        if tools:
+            tools[-1]["cache_control"] = _CACHE_CONTROL
+
         return tools
 
     async def _execute_tool(self, tool_name: str, tool_input: dict) -> str | ConfirmationRequired:
         """Execute a tool and return its result.
 
+        A tool that raises (bad arguments from the model, a malformed
+        controller record) yields an error string for the model instead of
+        aborting the whole query.
+
         Returns:
             String result, or ConfirmationRequired if the tool needs user confirmation.
         """
-        for tool_def in TOOL_DEFINITIONS:
-            if tool_def["name"] == tool_name:
-                func = tool_def["function"]
-                # Call the tool function with appropriate arguments
-                if tool_input:
-                    result = await func(**tool_input)
-                else:
-                    result = await func()
-                return result
-
-        return f"Unknown tool: {tool_name}"
-
-    async def query(self, user_message: str, context: dict | None = None) -> str | ConfirmationRequired:
+        tool_def = TOOL_BY_NAME.get(tool_name)
+        if tool_def is None:
+            return f"Unknown tool: {tool_name}"
+
+        logger.info(f"Executing tool: {tool_name}")
+        # Call the tool function with appropriate arguments
+        func = tool_def["function"]
+        try:
+            return await (func(**tool_input) if tool_input else func())
+        except Exception as e:
+            logger.error(f"Tool {tool_name} failed: {e}")
+            return f"Error running {tool_name}: {str(e)}"
+
+    async def _stream_turn(
+        self,
+        client: httpx.AsyncClient,
+        messages: list[dict],
+        on_text: Callable[[str], Awaitable[None]] | None = None,
+    ) -> tuple[str | None, list[dict], list[asyncio.Task | None]]:
+        """Stream one Messages API turn, starting read-only tools as their blocks complete.
+
+        A read-only tool_use block is dispatched as soon as its
+        content_block_stop event arrives, so its latency overlaps with the
+        rest of the stream. Tools with side effects are left for the caller
+        to run once the turn has stopped for tool use.
+
+        Args:
+            client: Shared Anthropic HTTP client
+            messages: Conversation so far
+            on_text: Optional callback receiving the turn's text so far
+
+        Returns:
+            Tuple of (stop_reason, content blocks, one task per tool_use block
+            in block order, None for tools that were not started)
+        """
+        stop_reason = None
+        content: list[dict] = []
+        json_parts: dict[int, list[str]] = {}
+        tasks: list[asyncio.Task | None] = []
+        text = ""
+
+        try:
+            body = self._encode_body(max_tokens=_MAX_TOKENS, messages=messages, stream=True)
+            async with client.stream("POST", self.api_url, content=body) as response:
+                response.raise_for_status()
+                async for line in response.aiter_lines():
+                    # Event names are repeated in each payload's "type" field
+                    if not line.startswith("data:"):
+                        continue
+                    data = json.loads(line[5:])
+                    event_type = data["type"]
+
+                    if event_type == "content_block_delta":
+                        delta = data["delta"]
+                        if delta["type"] == "text_delta":
+                            content[data["index"]]["text"] += delta["text"]
+                            if on_text:
+                                text += delta["text"]
+                                await on_text(text)
+                        elif delta["type"] == "input_json_delta":
+                            json_parts[data["index"]].append(delta["partial_json"])
+
+                    elif event_type == "content_block_start":
+                        block = data["content_block"]
+                        content.append(block)
+                        if block["type"] == "tool_use":
+                            json_parts[data["index"]] = []
+                        elif block["type"] == "text" and text:
+                            text += "\n"
+
+                    elif event_type == "content_block_stop":
+                        block = content[data["index"]]
+                        if block["type"] == "tool_use":
+                            raw_input = "".join(json_parts.pop(data["index"]))
+                            block["input"] = json.loads(raw_input) if raw_input else {}
+                            tool_def = TOOL_BY_NAME.get(block["name"])
+                            if tool_def and tool_def.get("read_only"):
+                                tasks.append(asyncio.create_task(
+                                    self._execute_tool(block["name"], block["input"])
+                                ))
+                            else:
+                                tasks.append(None)
+
+                    elif event_type == "message_delta":
+                        stop_reason = data["delta"].get("stop_reason") or stop_reason
+
+                    elif event_type == "error":
+                        error = data.get("error") or {}
+                        raise RuntimeError(f"Anthropic API error: {error.get('message', error)}")
+        except BaseException:
+            for task in tasks:
+                if task:
+                    task.cancel()
+            raise
+
+        return stop_reason, content, tasks
+
+    async def query(
+        self,
+        user_message: str,
+        context: dict | None = None,
+        on_text: Callable[[str], Awaitable[None]] | None = None,
+    ) -> str | ConfirmationRequired:
         """Query the agent with a user message.
 
         Args:
             user_message: The user's question or request
             context: Optional context dictionary
+            on_text: Optional callback receiving partial response text as it
+                streams in (reset at the start of each model turn)
 
         Returns:
             The agent's response text, or ConfirmationRequired if an admin
             action needs user confirmation before execution.
         """
         client = await self._get_client()
+        self._last_query = time.monotonic()
 
         # Build the messages
         messages = [{"role": "user", "content": user_message}]
@@ -119,15 +371,6 @@ class UniFiExpertAgent:
             context_str = f"\n\nContext:\n```json\n{json.dumps(context, indent=2)}\n```"
             messages[0]["content"] = user_message + context_str
 
-        # Build request body
-        body = {
-            "model": self.model,
-            "max_tokens": 4096,
-            "system": UNIFI_EXPERT_SYSTEM_PROMPT,
-            "tools": self._build_tools(),
-            "messages": messages,
-        }
-
         # Agentic loop - keep processing until we get a final response
         max_iterations = 10
         iteration = 0
@@ -136,57 +379,56 @@ class UniFiExpertAgent:
             iteration += 1
             logger.debug(f"Agent iteration {iteration}")
 
-            response = await client.post(self.api_url, json=body)
-            response.raise_for_status()
-            result = response.json()
-
-            stop_reason = result.get("stop_reason")
-            content = result.get("content", [])
+            stop_reason, content, tasks = await self._stream_turn(client, messages, on_text)
 
             # Check if we need to execute tools
             if stop_reason == "tool_use":
-                # Find and execute tool calls
-                tool_results = []
-                assistant_content = []
-
-                for block in content:
-                    if block.get("type") == "tool_use":
-                        tool_name = block.get("name")
-                        tool_input = block.get("input", {})
-                        tool_use_id = block.get("id")
-
-                        logger.info(f"Executing tool: {tool_name}")
-                        result = await self._execute_tool(tool_name, tool_input)
-
-                        # Check if this is a confirmation request
+                # Read-only tools started while the turn streamed; the rest run
+                # now, one at a time in block order. Stop at the first
+                # confirmation request so no later admin tool runs
+                tool_uses = [block for block in content if block["type"] == "tool_use"]
+                results = []
+                try:
+                    for block, task in zip(tool_uses, tasks):
+                        if task:
+                            result = await task
+                        else:
+                            result = await self._execute_tool(block["name"], block["input"])
                         if isinstance(result, ConfirmationRequired):
-                            logger.info(f"Tool {tool_name} requires confirmation")
+                            logger.info(f"Tool {block['name']} requires confirmation")
                             return result
-
-                        tool_results.append({
-                            "type": "tool_result",
-                            "tool_use_id": tool_use_id,
-                            "content": result,
-                        })
-                        assistant_content.append(block)
-                    else:
-                        assistant_content.append(block)
+                        results.append(result)
+                finally:
+                    # Leave no tool running unowned after an early return or error
+                    for task in tasks:
+                        if task:
+                            task.cancel()
+
+                tool_results = [
+                    {
+                        "type": "tool_result",
+                        "tool_use_id": block["id"],
+                        "content": result,
+                    }
+                    for block, result in zip(tool_uses, results)
+                ]
 
                 # Add assistant message with tool use and user message with results
-                messages.append({"role": "assistant", "content": assistant_content})
+                messages.append({"role": "assistant", "content": content})
                 messages.append({"role": "user", "content": tool_results})
-                body["messages"] = messages
+                _prune_tool_results(messages)
 
-            elif stop_reason == "end_turn":
-                # Extract final text response
-                text_parts = []
-                for block in content:
-                    if block.get("type") == "text":
-                        text_parts.append(block.get("text", ""))
+            else:
+                # Tools only count when the model actually stopped for them;
+                # anything started early is read-only, so cancelling is safe
+                for task in tasks:
+                    if task:
+                        task.cancel()
 
-                return "\n".join(text_parts)
+                if stop_reason == "end_turn":
+                    # Extract final text response
+                    return "\n".join(block["text"] for block in content if block["type"] == "text")
 
-            else:
                 # Unexpected stop reason
                 logger.warning(f"Unexpected stop reason: {stop_reason}")
                 break
@@ -203,37 +445,43 @@ class UniFiExpertAgent:
         Returns:
             AI-generated analysis and recommendations
         """
-        prompt = HEALTH_ANALYSIS_PROMPT.format(
-            device_data=json.dumps(devices, indent=2),
-            summary=summary,
-        )
+        # Serializing a large device list is CPU-bound; keep it off the event loop
+        prompt = await asyncio.to_thread(_format_health_prompt, devices, summary)
         return await self.query(prompt)
 
     async def analyze_audit(
         self,
         findings: list[dict],
-        networks: list[dict],
-        wlans: list[dict],
-        firewall_rules: list[dict],
-        devices: list[dict],
+        network_count: int,
+        wlan_count: int,
+        firewall_count: int,
+        device_count: int,
+        on_text: Callable[[str], Awaitable[None]] | None = None,
     ) -> str:
         """Analyze security audit findings and provide remediation steps.
 
+        Only ``findings`` is serialized into the prompt; the rest of the
+        configuration is summarized by count, so callers pass ``len(...)``
+        rather than the full lists.
+
         Args:
             findings: List of audit findings
-            networks: Network configuration
-            wlans: WLAN configuration
-            firewall_rules: Firewall rules
-            devices: Device information
+            network_count: Number of configured networks
+            wlan_count: Number of configured WLANs
+            firewall_count: Number of firewall rules
+            device_count: Number of devices
+            on_text: Optional callback receiving partial response text, as
+                in query()
 
         Returns:
             AI-generated remediation recommendations
         """
-        prompt = AUDIT_ANALYSIS_PROMPT.format(
-            findings=json.dumps(findings, indent=2),
-            network_count=len(networks),
-            wlan_count=len(wlans),
-            firewall_count=len(firewall_rules),
-            device_count=len(devices),
+        prompt = await asyncio.to_thread(
+            _format_audit_prompt,
+            findings,
+            network_count,
+            wlan_count,
+            firewall_count,
+            device_count,
         )
-        return await self.query(prompt)
+        return await self.query(prompt, on_text=on_text)
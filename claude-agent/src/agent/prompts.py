@@ -1,6 +1,9 @@
 """System prompts for the UniFi Expert Agent."""
 
-UNIFI_EXPERT_SYSTEM_PROMPT = """You are a UniFi Network Expert Assistant with deep expertise in:
+from pathlib import Path
+from typing import Final
+
+UNIFI_EXPERT_SYSTEM_PROMPT: Final[str] = """You are a UniFi Network Expert Assistant with deep expertise in:
 
 ## Core Competencies
 
@@ -38,47 +41,29 @@ UNIFI_EXPERT_SYSTEM_PROMPT = """You are a UniFi Network Expert Assistant with de
 - Site-to-site VPN configuration
 - Traffic identification and application control
 
-## Available Tools
-
-### Read-Only Tools (Always Available)
-- **get_unifi_sites**: List all managed sites
-- **get_unifi_devices**: Get device status, firmware, and health for a site
-- **get_device_details**: Get detailed info about a specific device by MAC
-- **get_network_config**: Get VLAN/network configuration
-- **get_wlan_config**: Get wireless settings (security, WPA3, PMF)
-- **get_firewall_rules**: Get firewall rule configuration
-- **search_knowledge_base**: Search documentation for best practices
-- **get_connected_clients**: List/search connected clients with traffic stats
-- **get_client_details**: Get full details for a specific client by MAC
-- **get_traffic_stats**: Get bandwidth and traffic statistics over time
-- **get_dpi_stats**: Get application-level traffic breakdown (Deep Packet Inspection)
-- **get_top_clients**: Get top bandwidth consumers
-- **get_recent_events**: Get device and client events (connections, disconnections, alerts)
-- **get_alarms**: Get active network alarms
-
-### Administrative Tools (Require Confirmation)
+## Administrative Tools (Require Confirmation)
 
 These tools can modify network configuration. When you determine an action is needed:
 1. **ALWAYS explain what will happen and why** before calling the tool
 2. **Tell the user a confirmation will be required** for dangerous actions
 3. **Call the tool WITHOUT a confirm_token** - the system handles confirmation automatically
 
-#### Device Commands (`device_admin_command`)
+### Device Commands (`device_admin_command`)
 - `locate`: Blink device LED (Safe - executes immediately)
 - `restart`: Reboot device (Moderate - requires confirmation)
 - `adopt`: Adopt new device (Moderate - requires confirmation)
 - `upgrade`: Start firmware upgrade (Dangerous - requires confirmation + Duo MFA)
 - `forget`: Remove device from controller (Critical - requires confirmation + Duo MFA)
 
-#### Client Commands (`client_admin_command`)
+### Client Commands (`client_admin_command`)
 - `unblock`: Remove client from blocklist (Safe - executes immediately)
 - `kick`: Disconnect client (Moderate - requires confirmation)
 - `block`: Permanently block client (Dangerous - requires confirmation + Duo MFA)
 
-#### Guest Access (`create_guest_access`)
+### Guest Access (`create_guest_access`)
 - Create temporary guest access with optional bandwidth limits (Safe - no confirmation)
 
-#### Network Configuration
+### Network Configuration
 - **update_wlan_settings**: Enable/disable WLAN or change password
   - Enabling: Safe - executes immediately
   - Disabling: Moderate - requires confirmation
@@ -107,17 +92,17 @@ These tools can modify network configuration. When you determine an action is ne
 ## Common Tasks
 
 - **Health Check**: Query devices, identify offline/degraded equipment, check firmware status
-- **Security Audit**: Review WPA3/PMF settings, VLAN segmentation, firewall rules
+- **Security Audit**: Use `get_audit_snapshot` to review WPA3/PMF settings, VLAN segmentation, firewall rules
 - **Troubleshooting**: Analyze device states, resource usage, connectivity issues
 - **Configuration Review**: Evaluate network setup against best practices
 - **Firmware Management**: Identify devices needing updates
 - **Client Management**: View connected clients, block/unblock, manage guest access
-- **Traffic Analysis**: View bandwidth usage, top talkers, application traffic
+- **Traffic Analysis**: View bandwidth usage, top talkers, application traffic (`get_network_overview` covers the common case in one call)
 
 When unsure, search the knowledge base first, then query live data if needed."""
 
 
-HEALTH_ANALYSIS_PROMPT = """Analyze the following UniFi network health data and provide:
+HEALTH_ANALYSIS_PROMPT: Final[str] = """Analyze the following UniFi network health data and provide:
 
 1. **Status Summary**: Overall network health in 1-2 sentences
 2. **Issues Found**: List any problems requiring attention (offline devices, high resource usage, etc.)
@@ -132,7 +117,7 @@ Summary:
 {summary}"""
 
 
-AUDIT_ANALYSIS_PROMPT = """Review this UniFi network security audit and provide:
+AUDIT_ANALYSIS_PROMPT: Final[str] = """Review this UniFi network security audit and provide:
 
 1. **Priority Ranking**: Order issues by severity and impact
 2. **Remediation Steps**: Specific actions for each finding with UniFi UI paths
@@ -148,3 +133,88 @@ Configuration Summary:
 - WLANs: {wlan_count}
 - Firewall Rules: {firewall_count}
 - Devices: {device_count}"""
+
+
+def _split_template(template: str, *fields: str) -> tuple[str, ...]:
+    """Split a template at its placeholders (in order) once, at import."""
+    parts = []
+    rest = template
+    for field in fields:
+        head, rest = rest.split("{" + field + "}")
+        parts.append(head)
+    parts.append(rest)
+    return tuple(parts)
+
+
+_HEALTH_PARTS: Final = _split_template(HEALTH_ANALYSIS_PROMPT, "device_data", "summary")
+_AUDIT_PARTS: Final = _split_template(
+    AUDIT_ANALYSIS_PROMPT,
+    "findings",
+    "network_count",
+    "wlan_count",
+    "firewall_count",
+    "device_count",
+)
+
+
+def render_health_prompt(device_data: str, summary: str) -> str:
+    """Fill HEALTH_ANALYSIS_PROMPT without re-parsing the template."""
+    pre, mid, post = _HEALTH_PARTS
+    return "".join((pre, device_data, mid, summary, post))
+
+
+def render_audit_prompt(
+    findings: str,
+    network_count: int,
+    wlan_count: int,
+    firewall_count: int,
+    device_count: int,
+) -> str:
+    """Fill AUDIT_ANALYSIS_PROMPT without re-parsing the template."""
+    p0, p1, p2, p3, p4, p5 = _AUDIT_PARTS
+    return "".join((
+        p0, findings,
+        p1, str(network_count),
+        p2, str(wlan_count),
+        p3, str(firewall_count),
+        p4, str(device_count),
+        p5,
+    ))
+
+
+def build_knowledge_preamble(knowledge_dir: str | Path, max_chars: int) -> str:
+    """Concatenate the reference docs into a static system prompt block.
+
+    Files are read in name order so the block is byte-identical across
+    restarts and stays in the cached prompt prefix.
+
+    Args:
+        knowledge_dir: Directory containing markdown reference docs
+        max_chars: Character budget for the block; files that would exceed
+            it are left to search_knowledge_base
+
+    Returns:
+        The preamble text, or an empty string if no docs fit
+    """
+    knowledge_dir = Path(knowledge_dir)
+    if max_chars <= 0 or not knowledge_dir.is_dir():
+        return ""
+
+    sections = []
+    total = 0
+    for md_file in sorted(knowledge_dir.glob("*.md")):
+        section = f"### {md_file.name}\n\n{md_file.read_text(encoding='utf-8').strip()}"
+        if total + len(section) > max_chars:
+            break
+        sections.append(section)
+        total += len(section)
+
+    if not sections:
+        return ""
+
+    return (
+        "## Reference Documentation\n\n"
+        "Answer from these references when they cover the question; use "
+        "search_knowledge_base for anything they don't.\n\n"
+        + "\n\n".join(sections)
+    )
@@ -4,12 +4,21 @@ These tools are registered with the Claude Agent SDK and can be invoked
 by the agent to query live UniFi controller data.
 """
 
+import asyncio
+import functools
+import heapq
+import json
 import logging
+import threading
+import time
+from collections.abc import Awaitable, Callable, Iterator
 from dataclasses import dataclass
-from typing import Literal
+from itertools import count, islice
+from operator import attrgetter, itemgetter
+from typing import Literal, NamedTuple
 
 from ..config import settings
-from ..unifi.controller_api import UniFiControllerAPI
+from ..unifi.controller_api import Client, UniFiControllerAPI
 from ..unifi.integration_api import UniFiIntegrationAPI
 
 logger = logging.getLogger(__name__)
@@ -31,16 +40,19 @@ class ConfirmationRequired:
 # Lazy-initialized API clients
 _integration_api: UniFiIntegrationAPI | None = None
 _controller_api: UniFiControllerAPI | None = None
+_api_init_lock = threading.Lock()
 
 
 def get_integration_api() -> UniFiIntegrationAPI:
     """Get or create the Integration API client."""
     global _integration_api
     if _integration_api is None:
-        _integration_api = UniFiIntegrationAPI(
-            base_url=settings.UNIFI_BASE_URL,
-            api_token=settings.UNIFI_API_TOKEN,
-        )
+        with _api_init_lock:
+            if _integration_api is None:
+                _integration_api = UniFiIntegrationAPI(
+                    base_url=settings.UNIFI_BASE_URL,
+                    api_token=settings.UNIFI_API_TOKEN,
+                )
     return _integration_api
 
 
@@ -48,18 +60,131 @@ def get_controller_api() -> UniFiControllerAPI:
     """Get or create the Controller API client."""
     global _controller_api
     if _controller_api is None:
-        _controller_api = UniFiControllerAPI(
-            base_url=settings.UNIFI_BASE_URL,
-            username=settings.UNIFI_USERNAME,
-            password=settings.UNIFI_PASSWORD,
-            site=settings.UNIFI_SITE,
-        )
+        with _api_init_lock:
+            if _controller_api is None:
+                _controller_api = UniFiControllerAPI(
+                    base_url=settings.UNIFI_BASE_URL,
+                    username=settings.UNIFI_USERNAME,
+                    password=settings.UNIFI_PASSWORD,
+                    site=settings.UNIFI_SITE,
+                )
     return _controller_api
 
 
+async def warm_api_clients() -> None:
+    """Open controller connections (and log in) before the first tool call."""
+    calls = []
+    if settings.UNIFI_API_TOKEN:
+        calls.append(get_integration_api().get_sites())
+    if settings.UNIFI_USERNAME:
+        calls.append(get_controller_api().authenticate())
+
+    for result in await asyncio.gather(*calls, return_exceptions=True):
+        if isinstance(result, Exception):
+            logger.warning(f"UniFi API warm-up failed: {result}")
+
+
+async def close_api_clients() -> None:
+    """Close the shared UniFi API clients."""
+    global _integration_api, _controller_api
+    if _integration_api:
+        await _integration_api.close()
+        _integration_api = None
+    if _controller_api:
+        await _controller_api.close()
+        _controller_api = None
+
+
+# ============================================================================
+# Read Tool Response Cache
+# ============================================================================
+
+# TTL policies (seconds) for cached read tool responses
+CACHE_TTL_SHORT = 10.0
+CACHE_TTL_NORMAL = 30.0
+CACHE_TTL_LONG = 60.0
+
+# (function name, args, kwargs) -> (expires_at, formatted response)
+_tool_cache: dict[tuple, tuple[float, str]] = {}
+
+# Controller devices keyed by normalized MAC, shared by per-device lookups
+_devices_by_mac: dict[str, dict] = {}
+_devices_by_mac_expires = 0.0
+_devices_lock = asyncio.Lock()
+
+def clear_tool_cache() -> None:
+    """Drop all cached tool responses (after an admin action changes state)."""
+    global _devices_by_mac_expires
+    _tool_cache.clear()
+    _devices_by_mac_expires = 0.0
+
+
+def _normalize_mac(mac: str) -> str:
+    """Normalize a MAC address to lower-case hex without separators."""
+    return mac.lower().replace(":", "").replace("-", "")
+
+
+async def _get_device_index() -> dict[str, dict]:
+    """Get controller devices indexed by MAC, refreshed every CACHE_TTL_SHORT.
+
+    One /stat/device call serves every device lookup in the window; the lock
+    makes concurrent lookups share a single refresh.
+
+    Returns:
+        Dict of normalized MAC -> device object
+    """
+    global _devices_by_mac, _devices_by_mac_expires
+    async with _devices_lock:
+        if time.monotonic() >= _devices_by_mac_expires:
+            devices = await get_controller_api().get_devices()
+            _devices_by_mac = {_normalize_mac(d.get("mac", "")): d for d in devices}
+            _devices_by_mac_expires = time.monotonic() + CACHE_TTL_SHORT
+    return _devices_by_mac
+
+
+def cached_tool(ttl: float, label: str) -> Callable:
+    """Cache a read tool's formatted response for ``ttl`` seconds.
+
+    The wrapped tool raises on failure. The error is logged and the last
+    cached response is served if one exists (stale-on-error), otherwise an
+    "Error fetching ..." message is returned.
+
+    Args:
+        ttl: Seconds a response stays fresh
+        label: Human-readable name of the data, used in error messages
+
+    Returns:
+        Decorator for an async tool function
+    """
+    def decorator(func: Callable[..., Awaitable[str]]) -> Callable[..., Awaitable[str]]:
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs) -> str:
+            key = (func.__name__, args, tuple(sorted(kwargs.items())))
+            now = time.monotonic()
+            entry = _tool_cache.get(key)
+            if entry and entry[0] > now:
+                return entry[1]
+
+            try:
+                result = await func(*args, **kwargs)
+            except Exception as e:
+                logger.error(f"Error getting {label}: {e}")
+                if entry:
+                    return entry[1]
+                return f"Error fetching {label}: {str(e)}"
+
+            _tool_cache[key] = (now + ttl, result)
+            return result
+
+        return wrapper
+
+    return decorator
+
+
 # Tool definitions for Claude Agent SDK
 # These are functions that will be wrapped as MCP tools
 
+@cached_tool(CACHE_TTL_LONG, "sites")
 async def get_unifi_sites() -> str:
     """Get list of all UniFi sites available.
 
@@ -67,24 +192,73 @@ async def get_unifi_sites() -> str:
         Formatted string with site information
     """
     api = get_integration_api()
-    try:
-        sites = await api.get_sites()
-        if not sites:
-            return "No sites found."
+    sites = await api.get_sites()
+    if not sites:
+        return "No sites found."
 
-        lines = [f"Found {len(sites)} site(s):"]
-        for site in sites:
-            ref = site.get("internalReference", "unknown")
-            name = site.get("name", "unnamed")
-            site_id = site.get("id", "?")
-            lines.append(f"- **{ref}** ({name}): ID={site_id}")
+    lines = [f"Found {len(sites)} site(s):"]
+    for site in sites:
+        ref = site.get("internalReference", "unknown")
+        name = site.get("name", "unnamed")
+        site_id = site.get("id", "?")
+        lines.append(f"- **{ref}** ({name}): ID={site_id}")
 
-        return "\n".join(lines)
-    except Exception as e:
-        logger.error(f"Error getting sites: {e}")
-        return f"Error fetching sites: {str(e)}"
+    return "\n".join(lines)
+
+
+def _devices_data(devices: list[dict]) -> dict:
+    """Summarize devices as compact data for the model to format.
+
+    Args:
+        devices: Device objects from the Integration API
+
+    Returns:
+        Dict with device counts, offline/other devices, the first 10 online
+        devices, and names with firmware upgrades available
+    """
+    # Categorize devices by state in a single pass
+    online = []
+    offline = []
+    other = []
+    upgradable = []
+    online_append = online.append
+    offline_append = offline.append
+    other_append = other.append
+
+    for d in devices:
+        d_get = d.get
+        name = d_get("name") or d_get("mac", "Unknown")
+        state = (d_get("state") or "").upper()
+        info = {
+            "name": name,
+            "model": d_get("model", ""),
+            "version": d_get("version") or d_get("displayableVersion", "?"),
+        }
+
+        if d_get("upgradable") or d_get("upgradeable"):
+            upgradable.append(name)
+
+        match state:
+            case "ONLINE" | "CONNECTED":
+                online_append(info)
+            case "OFFLINE" | "DISCONNECTED":
+                info["state"] = state
+                offline_append(info)
+            case _:
+                info["state"] = state
+                other_append(info)
+
+    return {
+        "total": len(devices),
+        "offline": offline,
+        "other": other,
+        "online_count": len(online),
+        "online": online[:10],  # Limit to first 10
+        "upgradable": upgradable,
+    }
 
 
+@cached_tool(CACHE_TTL_SHORT, "devices")
 async def get_unifi_devices(site_id: str | None = None) -> str:
     """Get all devices for a site with status, model, firmware info.
 
@@ -92,70 +266,30 @@ async def get_unifi_devices(site_id: str | None = None) -> str:
         site_id: Optional site ID. If not provided, uses default site.
 
     Returns:
-        Formatted string with device information
+        Compact JSON summary of device status for the model to format
     """
     api = get_integration_api()
-    try:
-        # Get site ID if not provided
-        if not site_id:
-            site = await api.get_site_by_reference(settings.UNIFI_SITE)
-            if not site:
-                return "No sites found."
-            site_id = site.get("id")
-
-        devices = await api.get_devices(site_id)
-        if not devices:
-            return "No devices found."
-
-        # Categorize devices by state
-        online = []
-        offline = []
-        other = []
-        upgradable = []
-
-        for d in devices:
-            name = d.get("name") or d.get("mac", "Unknown")
-            model = d.get("model", "")
-            state = (d.get("state") or "").upper()
-            version = d.get("version") or d.get("displayableVersion", "?")
-
-            info = f"- **{name}** ({model}): v{version}"
-
-            if d.get("upgradable") or d.get("upgradeable"):
-                upgradable.append(name)
-                info += " [UPGRADE AVAILABLE]"
-
-            if state in ("ONLINE", "CONNECTED"):
-                online.append(info)
-            elif state in ("OFFLINE", "DISCONNECTED"):
-                offline.append(info + f" - **{state}**")
-            else:
-                other.append(info + f" - {state}")
-
-        lines = [f"**Device Status** ({len(devices)} total)"]
-
-        if offline:
-            lines.append(f"\n:x: **Offline ({len(offline)}):**")
-            lines.extend(offline)
-
-        if other:
-            lines.append(f"\n:warning: **Other States ({len(other)}):**")
-            lines.extend(other)
-
-        lines.append(f"\n:white_check_mark: **Online ({len(online)}):**")
-        lines.extend(online[:10])  # Limit to first 10
-        if len(online) > 10:
-            lines.append(f"  ... and {len(online) - 10} more")
-
-        if upgradable:
-            lines.append(f"\n:arrow_up: **Firmware Updates Available:** {', '.join(upgradable)}")
+    # Get site ID if not provided
+    if not site_id:
+        site = await api.get_site_by_reference(settings.UNIFI_SITE)
+        if not site:
+            return "No sites found."
+        site_id = site.get("id")
 
-        return "\n".join(lines)
-    except Exception as e:
-        logger.error(f"Error getting devices: {e}")
-        return f"Error fetching devices: {str(e)}"
+    devices = await api.get_devices(site_id)
+    if not devices:
+        return "No devices found."
 
+    return json.dumps(_devices_data(devices), separators=(",", ":"))
 
+
+def _format_uptime(uptime: float | None) -> str:
+    """Format an uptime in seconds as "Xd Yh Zm"."""
+    seconds = int(uptime or 0)
+    return f"{seconds // 86400}d {seconds % 86400 // 3600}h {seconds % 3600 // 60}m"
+
+
+@cached_tool(CACHE_TTL_SHORT, "device details")
 async def get_device_details(mac_address: str) -> str:
     """Get detailed information about a specific device by MAC address.
 
@@ -165,52 +299,63 @@ async def get_device_details(mac_address: str) -> str:
     Returns:
         Formatted string with detailed device information
     """
-    api = get_controller_api()
-    try:
-        device = await api.get_device_by_mac(mac_address)
-        if not device:
-            return f"Device with MAC {mac_address} not found."
-
-        name = device.get("name") or device.get("mac", "Unknown")
-        model = device.get("model", "Unknown")
-        state = device.get("state", "unknown")
-        version = device.get("version", "?")
-        ip = device.get("ip", "N/A")
-        uptime = device.get("uptime", 0)
-
-        # Format uptime
-        days, remainder = divmod(uptime, 86400)
-        hours, remainder = divmod(remainder, 3600)
-        minutes, _ = divmod(remainder, 60)
-        uptime_str = f"{int(days)}d {int(hours)}h {int(minutes)}m"
-
-        # System stats
-        sys_stats = device.get("system-stats", {})
-        cpu = sys_stats.get("cpu", "N/A")
-        mem = sys_stats.get("mem", "N/A")
-
-        lines = [
-            f"**Device Details: {name}**",
-            f"- Model: {model}",
-            f"- State: {state}",
-            f"- Firmware: {version}",
-            f"- IP Address: {ip}",
-            f"- Uptime: {uptime_str}",
-            f"- CPU: {cpu}%",
-            f"- Memory: {mem}%",
-        ]
-
-        # Check for upgrades
-        if device.get("upgradable") or device.get("upgrade_to_firmware"):
-            new_ver = device.get("upgrade_to_firmware", "available")
-            lines.append(f"- :arrow_up: **Upgrade Available**: {new_ver}")
-
-        return "\n".join(lines)
-    except Exception as e:
-        logger.error(f"Error getting device details: {e}")
-        return f"Error fetching device details: {str(e)}"
-
-
+    devices_by_mac = await _get_device_index()
+    device = devices_by_mac.get(_normalize_mac(mac_address))
+    if not device:
+        return f"Device with MAC {mac_address} not found."
+
+    name = device.get("name") or device.get("mac", "Unknown")
+    model = device.get("model", "Unknown")
+    state = device.get("state", "unknown")
+    version = device.get("version", "?")
+    ip = device.get("ip", "N/A")
+    uptime_str = _format_uptime(device.get("uptime"))
+
+    # System stats
+    sys_stats = device.get("system-stats", {})
+    cpu = sys_stats.get("cpu", "N/A")
+    mem = sys_stats.get("mem", "N/A")
+
+    lines = [
+        f"**Device Details: {name}**",
+        f"- Model: {model}",
+        f"- State: {state}",
+        f"- Firmware: {version}",
+        f"- IP Address: {ip}",
+        f"- Uptime: {uptime_str}",
+        f"- CPU: {cpu}%",
+        f"- Memory: {mem}%",
+    ]
+
+    # Check for upgrades
+    if device.get("upgradable") or device.get("upgrade_to_firmware"):
+        new_ver = device.get("upgrade_to_firmware", "available")
+        lines.append(f"- :arrow_up: **Upgrade Available**: {new_ver}")
+
+    return "\n".join(lines)
+
+
+# Byte units for traffic formatting
+_KB = 1 << 10
+_MB = 1 << 20
+_GB = 1 << 30
+
+# Static Slack-markdown fragments for the config tools
+_STATUS_ICON = {True: ":white_check_mark:", False: ":x:"}
+_DHCP_LINE = {True: "  - DHCP: enabled", False: "  - DHCP: disabled"}
+_WPA3_LINE = {True: "  - WPA3: :white_check_mark: Enabled", False: "  - WPA3: :x: Disabled"}
+_PMF_LINE = {
+    "required": "  - PMF: :white_check_mark: Required",
+    "optional": "  - PMF: :warning: Optional",
+}
+_PMF_DEFAULT = "  - PMF: :x: Disabled"
+_GUEST_LINE = "  - Type: Guest Network"
+_HIDDEN_LINE = "  - Hidden: Yes"
+_ACTION_ICON = {"drop": ":no_entry:"}
+_ACTION_ICON_DEFAULT = ":arrow_right:"
+
+
+@cached_tool(CACHE_TTL_NORMAL, "network config")
 async def get_network_config() -> str:
     """Get network/VLAN configuration for the site.
 
@@ -218,31 +363,27 @@ async def get_network_config() -> str:
         Formatted string with network configuration
     """
     api = get_controller_api()
-    try:
-        networks = await api.get_networks()
-        if not networks:
-            return "No networks configured."
+    networks = await api.get_networks()
+    if not networks:
+        return "No networks configured."
 
-        lines = [f"**Network Configuration** ({len(networks)} networks):"]
+    lines = [f"**Network Configuration** ({len(networks)} networks):"]
 
-        for net in networks:
-            name = net.get("name", "unnamed")
-            purpose = net.get("purpose", "unknown")
-            vlan = net.get("vlan", "untagged")
-            subnet = net.get("ip_subnet", "N/A")
-            dhcp = "enabled" if net.get("dhcpd_enabled") else "disabled"
+    for net in networks:
+        name = net.get("name", "unnamed")
+        purpose = net.get("purpose", "unknown")
+        vlan = net.get("vlan", "untagged")
+        subnet = net.get("ip_subnet", "N/A")
 
-            lines.append(f"\n**{name}** (VLAN {vlan})")
-            lines.append(f"  - Purpose: {purpose}")
-            lines.append(f"  - Subnet: {subnet}")
-            lines.append(f"  - DHCP: {dhcp}")
+        lines.append(f"\n**{name}** (VLAN {vlan})")
+        lines.append(f"  - Purpose: {purpose}")
+        lines.append(f"  - Subnet: {subnet}")
+        lines.append(_DHCP_LINE[bool(net.get("dhcpd_enabled"))])
 
-        return "\n".join(lines)
-    except Exception as e:
-        logger.error(f"Error getting network config: {e}")
-        return f"Error fetching network config: {str(e)}"
+    return "\n".join(lines)
 
 
+@cached_tool(CACHE_TTL_NORMAL, "WLAN config")
 async def get_wlan_config() -> str:
     """Get wireless network (SSID) configuration.
 
@@ -250,51 +391,36 @@ async def get_wlan_config() -> str:
         Formatted string with WLAN configuration
     """
     api = get_controller_api()
-    try:
-        wlans = await api.get_wlans()
-        if not wlans:
-            return "No wireless networks configured."
-
-        lines = [f"**Wireless Networks** ({len(wlans)} SSIDs):"]
-
-        for wlan in wlans:
-            name = wlan.get("name", "unnamed")
-            enabled = wlan.get("enabled", True)
-            security = wlan.get("security", "unknown")
-            wpa_mode = wlan.get("wpa_mode", "")
-            wpa3 = wlan.get("wpa3_support", False)
-            pmf = wlan.get("pmf_mode", "unknown")
-            is_guest = wlan.get("is_guest", False)
-            hidden = wlan.get("hide_ssid", False)
-
-            status = ":white_check_mark:" if enabled else ":x:"
-
-            lines.append(f"\n{status} **{name}**")
-            lines.append(f"  - Security: {security} ({wpa_mode})")
-
-            if wpa3:
-                lines.append("  - WPA3: :white_check_mark: Enabled")
-            else:
-                lines.append("  - WPA3: :x: Disabled")
-
-            if pmf == "required":
-                lines.append("  - PMF: :white_check_mark: Required")
-            elif pmf == "optional":
-                lines.append("  - PMF: :warning: Optional")
-            else:
-                lines.append("  - PMF: :x: Disabled")
-
-            if is_guest:
-                lines.append("  - Type: Guest Network")
-            if hidden:
-                lines.append("  - Hidden: Yes")
+    wlans = await api.get_wlans()
+    if not wlans:
+        return "No wireless networks configured."
+
+    lines = [f"**Wireless Networks** ({len(wlans)} SSIDs):"]
+
+    for wlan in wlans:
+        name = wlan.get("name", "unnamed")
+        enabled = wlan.get("enabled", True)
+        security = wlan.get("security", "unknown")
+        wpa_mode = wlan.get("wpa_mode", "")
+        wpa3 = wlan.get("wpa3_support", False)
+        pmf = wlan.get("pmf_mode", "unknown")
+        is_guest = wlan.get("is_guest", False)
+        hidden = wlan.get("hide_ssid", False)
+
+        lines.append(f"\n{_STATUS_ICON[bool(enabled)]} **{name}**")
+        lines.append(f"  - Security: {security} ({wpa_mode})")
+        lines.append(_WPA3_LINE[bool(wpa3)])
+        lines.append(_PMF_LINE.get(pmf, _PMF_DEFAULT))
 
-        return "\n".join(lines)
-    except Exception as e:
-        logger.error(f"Error getting WLAN config: {e}")
-        return f"Error fetching WLAN config: {str(e)}"
+        if is_guest:
+            lines.append(_GUEST_LINE)
+        if hidden:
+            lines.append(_HIDDEN_LINE)
 
+    return "\n".join(lines)
 
+
+@cached_tool(CACHE_TTL_NORMAL, "firewall rules")
 async def get_firewall_rules() -> str:
     """Get firewall rules for the site.
 
@@ -302,28 +428,45 @@ async def get_firewall_rules() -> str:
         Formatted string with firewall rules
     """
     api = get_controller_api()
-    try:
-        rules = await api.get_firewall_rules()
-        if not rules:
-            return "No custom firewall rules configured."
+    rules = await api.get_firewall_rules()
+    if not rules:
+        return "No custom firewall rules configured."
 
-        lines = [f"**Firewall Rules** ({len(rules)} rules):"]
+    lines = [f"**Firewall Rules** ({len(rules)} rules):"]
 
-        for rule in rules:
-            name = rule.get("name", "unnamed")
-            enabled = rule.get("enabled", True)
-            action = rule.get("action", "?")
-            ruleset = rule.get("ruleset", "?")
+    for rule in rules:
+        name = rule.get("name", "unnamed")
+        enabled = rule.get("enabled", True)
+        action = rule.get("action", "?")
+        ruleset = rule.get("ruleset", "?")
 
-            status = ":white_check_mark:" if enabled else ":x:"
-            action_icon = ":no_entry:" if action == "drop" else ":arrow_right:"
+        status = _STATUS_ICON[bool(enabled)]
+        action_icon = _ACTION_ICON.get(action, _ACTION_ICON_DEFAULT)
 
-            lines.append(f"- {status} {action_icon} **{name}**: {action} ({ruleset})")
+        lines.append(f"- {status} {action_icon} **{name}**: {action} ({ruleset})")
+
+    return "\n".join(lines)
 
-        return "\n".join(lines)
-    except Exception as e:
-        logger.error(f"Error getting firewall rules: {e}")
-        return f"Error fetching firewall rules: {str(e)}"
+
+async def get_audit_snapshot(site_id: str | None = None) -> str:
+    """Get networks, WLANs, firewall rules, and devices in one call.
+
+    The four sections are fetched concurrently, so a security audit costs one
+    controller round trip of wall-clock time instead of four.
+
+    Args:
+        site_id: Optional site ID for the device list. Uses default site if omitted.
+
+    Returns:
+        Formatted string with all four configuration sections
+    """
+    sections = await asyncio.gather(
+        get_network_config(),
+        get_wlan_config(),
+        get_firewall_rules(),
+        get_unifi_devices(site_id),
+    )
+    return "\n\n".join(sections)
 
 
 async def search_knowledge_base(query: str) -> str:
@@ -365,6 +508,34 @@ async def search_knowledge_base(query: str) -> str:
 # Additional Read Tools (Phase 1)
 # ============================================================================
 
+def _format_client_line(client: Client) -> str:
+    """Format one entry of the connected clients list."""
+    signal_part = f" | Signal: {client.signal}dBm" if client.signal else ""
+    return (
+        f"- **{client.hostname}** ({client.mac})\n"
+        f"  IP: {client.ip} | Network: {client.essid or 'Wired'}{signal_part}\n"
+        f"  Traffic: {client.rx_bytes / _MB:.1f}MB down / {client.tx_bytes / _MB:.1f}MB up"
+    )
+
+
+def _iter_matching_clients(
+    clients: list[Client], network_lower: str | None, search_lower: str | None
+) -> Iterator[Client]:
+    """Yield clients matching the lower-cased network and search filters.
+
+    A generator function rather than a generator expression, so the filter
+    terms are fast locals instead of closure cells.
+    """
+    for client in clients:
+        if network_lower is not None and not (
+            network_lower in client.essid.lower() or network_lower in client.network.lower()
+        ):
+            continue
+        if search_lower is not None and search_lower not in client.search_key:
+            continue
+        yield client
+
+
 async def get_connected_clients(network: str | None = None, search: str | None = None) -> str:
     """Get connected clients with optional filtering.
 
@@ -378,55 +549,33 @@ async def get_connected_clients(network: str | None = None, search: str | None =
     api = get_controller_api()
     try:
         clients = await api.get_clients()
-        if not clients:
-            return "No clients currently connected."
-
-        # Apply filters
-        filtered = clients
-        if network:
-            network_lower = network.lower()
-            filtered = [c for c in filtered if network_lower in c.get("essid", "").lower()
-                       or network_lower in c.get("network", "").lower()]
-        if search:
-            search_lower = search.lower()
-            filtered = [c for c in filtered if
-                       search_lower in c.get("hostname", "").lower() or
-                       search_lower in c.get("mac", "").lower() or
-                       search_lower in c.get("ip", "").lower()]
-
-        if not filtered:
-            return "No clients found matching the criteria."
-
-        lines = [f"**Connected Clients** ({len(filtered)} of {len(clients)} total):"]
-
-        for client in filtered[:20]:  # Limit to 20
-            hostname = client.get("hostname") or client.get("name") or "Unknown"
-            mac = client.get("mac", "?")
-            ip = client.get("ip", "N/A")
-            ssid = client.get("essid", "Wired")
-            signal = client.get("signal", None)
-            rx_bytes = client.get("rx_bytes", 0)
-            tx_bytes = client.get("tx_bytes", 0)
-
-            # Format traffic
-            rx_mb = rx_bytes / (1024 * 1024)
-            tx_mb = tx_bytes / (1024 * 1024)
-
-            line = f"- **{hostname}** ({mac})"
-            line += f"\n  IP: {ip} | Network: {ssid}"
-            if signal:
-                line += f" | Signal: {signal}dBm"
-            line += f"\n  Traffic: {rx_mb:.1f}MB down / {tx_mb:.1f}MB up"
-            lines.append(line)
-
-        if len(filtered) > 20:
-            lines.append(f"\n... and {len(filtered) - 20} more clients")
-
-        return "\n".join(lines)
     except Exception as e:
         logger.error(f"Error getting clients: {e}")
         return f"Error fetching clients: {str(e)}"
 
+    if not clients:
+        return "No clients currently connected."
+
+    # Apply both filters in a single pass, materializing only what is shown
+    matches = _iter_matching_clients(
+        clients,
+        network.lower() if network else None,
+        search.lower() if search else None,
+    )
+    shown = list(islice(matches, 20))  # Limit to 20
+    if not shown:
+        return "No clients found matching the criteria."
+    # Count the remaining matches without building a list
+    match_count = len(shown) + sum(1 for _ in matches)
+
+    lines = [f"**Connected Clients** ({match_count} of {len(clients)} total):"]
+    lines.extend(map(_format_client_line, shown))
+
+    if match_count > 20:
+        lines.append(f"\n... and {match_count - 20} more clients")
+
+    return "\n".join(lines)
+
 
 async def get_client_details(mac_address: str) -> str:
     """Get detailed information about a specific client.
@@ -440,56 +589,51 @@ async def get_client_details(mac_address: str) -> str:
     api = get_controller_api()
     try:
         client = await api.get_client_by_mac(mac_address)
-        if not client:
-            return f"Client with MAC {mac_address} not found or not currently connected."
-
-        hostname = client.get("hostname") or client.get("name") or "Unknown"
-        mac = client.get("mac", "?")
-        ip = client.get("ip", "N/A")
-        ssid = client.get("essid", "Wired")
-        is_wired = client.get("is_wired", False)
-        signal = client.get("signal")
-        uptime = client.get("uptime", 0)
-        rx_bytes = client.get("rx_bytes", 0)
-        tx_bytes = client.get("tx_bytes", 0)
-        is_guest = client.get("is_guest", False)
-        blocked = client.get("blocked", False)
-
-        # Format uptime
-        days, remainder = divmod(uptime, 86400)
-        hours, remainder = divmod(remainder, 3600)
-        minutes, _ = divmod(remainder, 60)
-        uptime_str = f"{int(days)}d {int(hours)}h {int(minutes)}m"
-
-        # Format traffic
-        rx_mb = rx_bytes / (1024 * 1024)
-        tx_mb = tx_bytes / (1024 * 1024)
-
-        lines = [
-            f"**Client Details: {hostname}**",
-            f"- MAC: `{mac}`",
-            f"- IP Address: {ip}",
-            f"- Connection: {'Wired' if is_wired else f'Wireless ({ssid})'}",
-        ]
-
-        if not is_wired and signal:
-            lines.append(f"- Signal Strength: {signal}dBm")
-
-        lines.extend([
-            f"- Connected For: {uptime_str}",
-            f"- Traffic: {rx_mb:.1f}MB down / {tx_mb:.1f}MB up",
-        ])
-
-        if is_guest:
-            lines.append("- :bust_in_silhouette: Guest Client")
-        if blocked:
-            lines.append("- :no_entry: **BLOCKED**")
-
-        return "\n".join(lines)
     except Exception as e:
         logger.error(f"Error getting client details: {e}")
         return f"Error fetching client details: {str(e)}"
 
+    if not client:
+        return f"Client with MAC {mac_address} not found or not currently connected."
+
+    uptime_str = _format_uptime(client.uptime)
+
+    # Format traffic
+    rx_mb = client.rx_bytes / _MB
+    tx_mb = client.tx_bytes / _MB
+
+    connection = "Wired" if client.is_wired else f"Wireless ({client.essid or 'Wired'})"
+    lines = [
+        f"**Client Details: {client.hostname}**",
+        f"- MAC: `{client.mac}`",
+        f"- IP Address: {client.ip}",
+        f"- Connection: {connection}",
+    ]
+
+    if not client.is_wired and client.signal:
+        lines.append(f"- Signal Strength: {client.signal}dBm")
+
+    lines.extend([
+        f"- Connected For: {uptime_str}",
+        f"- Traffic: {rx_mb:.1f}MB down / {tx_mb:.1f}MB up",
+    ])
+
+    if client.is_guest:
+        lines.append("- :bust_in_silhouette: Guest Client")
+    if client.blocked:
+        lines.append("- :no_entry: **BLOCKED**")
+
+    return "\n".join(lines)
+
+
+def _format_bytes(b: float) -> str:
+    """Format a byte count as a human-readable KB/MB/GB string."""
+    if b > _GB:
+        return f"{b / _GB:.2f} GB"
+    if b > _MB:
+        return f"{b / _MB:.2f} MB"
+    return f"{b / _KB:.2f} KB"
+
 
 async def get_traffic_stats(hours: int = 24) -> str:
     """Get traffic statistics for the site.
@@ -503,37 +647,33 @@ async def get_traffic_stats(hours: int = 24) -> str:
     api = get_controller_api()
     try:
         stats = await api.get_hourly_site_stats(hours)
-        if not stats:
-            return "No traffic statistics available."
-
-        # Aggregate stats
-        total_rx = sum(s.get("wan-rx_bytes", 0) for s in stats)
-        total_tx = sum(s.get("wan-tx_bytes", 0) for s in stats)
-        total_bytes = sum(s.get("bytes", 0) for s in stats)
-        avg_clients = sum(s.get("num_sta", 0) for s in stats) / len(stats) if stats else 0
-
-        # Convert to human-readable
-        def format_bytes(b):
-            if b > 1024**3:
-                return f"{b / 1024**3:.2f} GB"
-            elif b > 1024**2:
-                return f"{b / 1024**2:.2f} MB"
-            else:
-                return f"{b / 1024:.2f} KB"
-
-        lines = [
-            f"**Traffic Statistics** (Last {hours} hours)",
-            f"- WAN Download: {format_bytes(total_rx)}",
-            f"- WAN Upload: {format_bytes(total_tx)}",
-            f"- Total LAN Traffic: {format_bytes(total_bytes)}",
-            f"- Average Connected Clients: {avg_clients:.1f}",
-        ]
-
-        return "\n".join(lines)
     except Exception as e:
         logger.error(f"Error getting traffic stats: {e}")
         return f"Error fetching traffic stats: {str(e)}"
 
+    if not stats:
+        return "No traffic statistics available."
+
+    # Aggregate stats in a single pass
+    total_rx = total_tx = total_bytes = total_sta = 0
+    for s in stats:
+        s_get = s.get
+        total_rx += s_get("wan-rx_bytes", 0)
+        total_tx += s_get("wan-tx_bytes", 0)
+        total_bytes += s_get("bytes", 0)
+        total_sta += s_get("num_sta", 0)
+    avg_clients = total_sta / len(stats)
+
+    lines = [
+        f"**Traffic Statistics** (Last {hours} hours)",
+        f"- WAN Download: {_format_bytes(total_rx)}",
+        f"- WAN Upload: {_format_bytes(total_tx)}",
+        f"- Total LAN Traffic: {_format_bytes(total_bytes)}",
+        f"- Average Connected Clients: {avg_clients:.1f}",
+    ]
+
+    return "\n".join(lines)
+
 
 async def get_dpi_stats() -> str:
     """Get Deep Packet Inspection (DPI) statistics showing traffic by application.
@@ -544,29 +684,40 @@ async def get_dpi_stats() -> str:
     api = get_controller_api()
     try:
         dpi = await api.get_dpi()
-        if not dpi:
-            return "No DPI statistics available. DPI may be disabled."
+    except Exception as e:
+        logger.error(f"Error getting DPI stats: {e}")
+        return f"Error fetching DPI stats: {str(e)}"
 
-        # Sort by total traffic
-        sorted_dpi = sorted(dpi, key=lambda x: x.get("rx_bytes", 0) + x.get("tx_bytes", 0), reverse=True)
+    if not dpi:
+        return "No DPI statistics available. DPI may be disabled."
 
-        lines = ["**Application Traffic (DPI)**"]
+    # Top 15 by total traffic, reading each entry's byte counts once
+    keyed = []
+    for e in dpi:
+        rx, tx = e.get("rx_bytes", 0), e.get("tx_bytes", 0)
+        keyed.append((rx + tx, rx, tx, e))
+    top_dpi = heapq.nlargest(15, keyed, key=itemgetter(0))
 
-        for entry in sorted_dpi[:15]:  # Top 15
-            app = entry.get("app", "Unknown")
-            cat = entry.get("cat", "Unknown")
-            rx = entry.get("rx_bytes", 0) / (1024 * 1024)
-            tx = entry.get("tx_bytes", 0) / (1024 * 1024)
+    lines = ["**Application Traffic (DPI)**"]
 
-            lines.append(f"- **{app}** ({cat}): {rx:.1f}MB down / {tx:.1f}MB up")
+    for _, rx, tx, entry in top_dpi:
+        app = entry.get("app", "Unknown")
+        cat = entry.get("cat", "Unknown")
 
-        if len(sorted_dpi) > 15:
-            lines.append(f"\n... and {len(sorted_dpi) - 15} more categories")
+        lines.append(f"- **{app}** ({cat}): {rx / _MB:.1f}MB down / {tx / _MB:.1f}MB up")
+
+    if len(dpi) > 15:
+        lines.append(f"\n... and {len(dpi) - 15} more categories")
+
+    return "\n".join(lines)
 
-        return "\n".join(lines)
-    except Exception as e:
-        logger.error(f"Error getting DPI stats: {e}")
-        return f"Error fetching DPI stats: {str(e)}"
+
+def _format_top_client_line(rank: int, client: Client) -> str:
+    """Format one ranked entry of the top clients list."""
+    return (
+        f"{rank}. **{client.hostname}** ({client.mac}): "
+        f"{client.rx_bytes / _MB:.1f}MB down / {client.tx_bytes / _MB:.1f}MB up"
+    )
 
 
 async def get_top_clients(limit: int = 10, metric: str = "rx_bytes") -> str:
@@ -579,30 +730,56 @@ async def get_top_clients(limit: int = 10, metric: str = "rx_bytes") -> str:
     Returns:
         Formatted string with top clients
     """
+    if metric not in ("rx_bytes", "tx_bytes"):
+        return f"Unknown metric: {metric}. Valid metrics: rx_bytes, tx_bytes"
+
     api = get_controller_api()
     try:
         clients = await api.get_clients()
-        if not clients:
-            return "No clients currently connected."
+    except Exception as e:
+        logger.error(f"Error getting top clients: {e}")
+        return f"Error fetching top clients: {str(e)}"
 
-        # Sort by metric
-        sorted_clients = sorted(clients, key=lambda x: x.get(metric, 0), reverse=True)
+    if not clients:
+        return "No clients currently connected."
 
-        metric_label = "Download" if metric == "rx_bytes" else "Upload"
-        lines = [f"**Top {min(limit, len(sorted_clients))} Clients by {metric_label}**"]
+    # Partial sort by metric
+    top_clients = heapq.nlargest(limit, clients, key=attrgetter(metric))
 
-        for i, client in enumerate(sorted_clients[:limit], 1):
-            hostname = client.get("hostname") or client.get("name") or "Unknown"
-            mac = client.get("mac", "?")
-            rx = client.get("rx_bytes", 0) / (1024 * 1024)
-            tx = client.get("tx_bytes", 0) / (1024 * 1024)
+    metric_label = "Download" if metric == "rx_bytes" else "Upload"
+    lines = [f"**Top {len(top_clients)} Clients by {metric_label}**"]
+    lines.extend(map(_format_top_client_line, count(1), top_clients))
 
-            lines.append(f"{i}. **{hostname}** ({mac}): {rx:.1f}MB down / {tx:.1f}MB up")
+    return "\n".join(lines)
+
+
+# Event key substrings -> icon, checked in order
+_EVENT_ICON_RULES = (
+    (("connected", "up"), ":white_check_mark:"),
+    (("disconnected", "down"), ":x:"),
+    (("upgrade",), ":arrow_up:"),
+    (("error", "fail"), ":warning:"),
+)
+_EVENT_ICON_DEFAULT = ":information_source:"
 
-        return "\n".join(lines)
-    except Exception as e:
-        logger.error(f"Error getting top clients: {e}")
-        return f"Error fetching top clients: {str(e)}"
+
+@functools.lru_cache(maxsize=256)
+def _classify_event_icon(key: str) -> str:
+    """Pick the icon for an event key (first matching rule wins).
+
+    Event streams repeat a few dozen distinct keys, so each is classified once.
+    """
+    key_lower = key.lower()
+    return next(
+        (icon for tokens, icon in _EVENT_ICON_RULES if any(t in key_lower for t in tokens)),
+        _EVENT_ICON_DEFAULT,
+    )
+
+
+def _format_event_line(event: dict) -> str:
+    """Format one entry of the recent events list."""
+    key = event.get("key", "unknown")
+    return f"- {_classify_event_icon(key)} `{key}`: {event.get('msg', 'No message')}"
 
 
 async def get_recent_events(hours: int = 24, event_type: str | None = None) -> str:
@@ -618,45 +795,35 @@ async def get_recent_events(hours: int = 24, event_type: str | None = None) -> s
     api = get_controller_api()
     try:
         events = await api.get_events(hours)
-        if not events:
-            return f"No events in the last {hours} hours."
+    except Exception as e:
+        logger.error(f"Error getting events: {e}")
+        return f"Error fetching events: {str(e)}"
 
-        # Filter by type if specified
-        if event_type:
-            type_lower = event_type.lower()
-            events = [e for e in events if type_lower in e.get("key", "").lower()]
+    if not events:
+        return f"No events in the last {hours} hours."
 
-        if not events:
-            return f"No events matching '{event_type}' in the last {hours} hours."
+    # Filter by type if specified, materializing only what is shown
+    matches = iter(events)
+    if event_type:
+        type_lower = event_type.lower()
+        matches = (e for e in events if type_lower in e.get("key", "").lower())
 
-        lines = [f"**Recent Events** (Last {hours} hours, showing up to 20)"]
+    shown = list(islice(matches, 20))
+    if not shown:
+        return f"No events matching '{event_type}' in the last {hours} hours."
+    # Count the remaining matches without building a list
+    match_count = len(shown) + sum(1 for _ in matches)
 
-        for event in events[:20]:
-            key = event.get("key", "unknown")
-            msg = event.get("msg", "No message")
-            time_str = event.get("datetime", "?")
+    lines = [f"**Recent Events** (Last {hours} hours, showing up to 20)"]
+    lines.extend(map(_format_event_line, shown))
 
-            # Determine icon based on event type
-            if "connected" in key.lower() or "up" in key.lower():
-                icon = ":white_check_mark:"
-            elif "disconnected" in key.lower() or "down" in key.lower():
-                icon = ":x:"
-            elif "upgrade" in key.lower():
-                icon = ":arrow_up:"
-            elif "error" in key.lower() or "fail" in key.lower():
-                icon = ":warning:"
-            else:
-                icon = ":information_source:"
+    if match_count > 20:
+        lines.append(f"\n... and {match_count - 20} more events")
 
-            lines.append(f"- {icon} `{key}`: {msg}")
+    return "\n".join(lines)
 
-        if len(events) > 20:
-            lines.append(f"\n... and {len(events) - 20} more events")
 
-        return "\n".join(lines)
-    except Exception as e:
-        logger.error(f"Error getting events: {e}")
-        return f"Error fetching events: {str(e)}"
+_ALARM_STATUS = {True: ":white_check_mark: Resolved", False: ":rotating_light: Active"}
 
 
 async def get_alarms(include_archived: bool = False) -> str:
@@ -671,32 +838,53 @@ async def get_alarms(include_archived: bool = False) -> str:
     api = get_controller_api()
     try:
         alarms = await api.get_alarms()
-        if not alarms:
-            return ":white_check_mark: No active alarms."
+    except Exception as e:
+        logger.error(f"Error getting alarms: {e}")
+        return f"Error fetching alarms: {str(e)}"
 
-        # Filter by archived status
-        if not include_archived:
-            alarms = [a for a in alarms if not a.get("archived", False)]
+    if not alarms:
+        return ":white_check_mark: No active alarms."
 
-        if not alarms:
-            return ":white_check_mark: No active alarms (some archived alarms exist)."
+    # Filter by archived status
+    matches = iter(alarms)
+    if not include_archived:
+        matches = (a for a in alarms if not a.get("archived", False))
 
-        lines = [f"**Active Alarms** ({len(alarms)} total)"]
+    shown = list(islice(matches, 20))
+    if not shown:
+        return ":white_check_mark: No active alarms (some archived alarms exist)."
+    # Count the remaining matches without building a list
+    match_count = len(shown) + sum(1 for _ in matches)
 
-        for alarm in alarms[:20]:
-            key = alarm.get("key", "unknown")
-            msg = alarm.get("msg", "No message")
-            time_str = alarm.get("datetime", "?")
-            archived = alarm.get("archived", False)
+    lines = [f"**Active Alarms** ({match_count} total)"]
 
-            status = ":white_check_mark: Resolved" if archived else ":rotating_light: Active"
-            lines.append(f"- {status} **{key}**")
-            lines.append(f"  {msg}")
+    for alarm in shown:
+        status = _ALARM_STATUS[bool(alarm.get("archived"))]
+        lines.append(f"- {status} **{alarm.get('key', 'unknown')}**")
+        lines.append(f"  {alarm.get('msg', 'No message')}")
 
-        return "\n".join(lines)
-    except Exception as e:
-        logger.error(f"Error getting alarms: {e}")
-        return f"Error fetching alarms: {str(e)}"
+    return "\n".join(lines)
+
+
+async def get_network_overview(hours: int = 24) -> str:
+    """Get clients, traffic, application usage, and alarms in one call.
+
+    The four sections are fetched concurrently, so a dashboard-style overview
+    costs one controller round trip of wall-clock time instead of four.
+
+    Args:
+        hours: Number of hours of traffic stats to include (default: 24)
+
+    Returns:
+        Formatted string with all four sections
+    """
+    sections = await asyncio.gather(
+        get_connected_clients(),
+        get_traffic_stats(hours),
+        get_dpi_stats(),
+        get_alarms(),
+    )
+    return "\n\n".join(sections)
 
 
 # ============================================================================
@@ -718,6 +906,93 @@ def get_confirmation_store():
     return _confirmation_store
 
 
+async def _consume_confirm_token(tool_name: str, confirm_token: str) -> str | None:
+    """Validate and consume a confirmation token for an admin tool.
+
+    Tokens are single-use, so validation results are never cached: a second
+    presentation of the same token must fail.
+
+    Args:
+        tool_name: The tool the token should be for
+        confirm_token: Token issued when the user confirmed the action
+
+    Returns:
+        An error message for the user, or None if the token was valid
+    """
+    store = _confirmation_store
+    if store is None:
+        return "Error: Confirmation system not initialized."
+    if await store.validate_token_async(tool_name, confirm_token) is None:
+        return "Error: Invalid or expired confirmation token. Please request the action again."
+    return None
+
+
+class _AdminCommand(NamedTuple):
+    """Static metadata for one admin command."""
+
+    title: str
+    risk_level: str | None  # None = safe, executes without confirmation
+    impact: str | None
+    api_cmd: str
+    result: str  # Template filled with the target MAC
+
+
+_FORGET_IMPACT = "Device will be removed from the controller. You will need to re-adopt it to manage it again."
+_FORGET_RESULT = ":wastebasket: Device {mac} has been removed from the controller."
+
+_DEVICE_COMMANDS = {
+    "locate": _AdminCommand(
+        "Locate", None, None, "locate",
+        ":flashlight: LED on device {mac} is now blinking for identification.",
+    ),
+    "restart": _AdminCommand(
+        "Restart", "moderate",
+        "Device will reboot. Connected clients will be disconnected for ~1-2 minutes.",
+        "restart", ":arrows_counterclockwise: Device {mac} is restarting.",
+    ),
+    "adopt": _AdminCommand(
+        "Adopt", "moderate", "Device will be adopted and added to your controller.",
+        "adopt", ":heavy_plus_sign: Device {mac} is being adopted.",
+    ),
+    "upgrade": _AdminCommand(
+        "Upgrade", "dangerous",
+        "Firmware upgrade will begin. Device will be unavailable for several minutes during the upgrade.",
+        "upgrade", ":arrow_up: Firmware upgrade started on {mac}.",
+    ),
+    # The controller API calls 'forget' 'delete'
+    "forget": _AdminCommand("Forget", "critical", _FORGET_IMPACT, "delete", _FORGET_RESULT),
+    "delete": _AdminCommand("Delete", "critical", _FORGET_IMPACT, "delete", _FORGET_RESULT),
+}
+
+_CLIENT_COMMANDS = {
+    "unblock": _AdminCommand(
+        "Unblock", None, None, "unblock",
+        ":white_check_mark: Client {mac} has been unblocked.",
+    ),
+    "kick": _AdminCommand(
+        "Kick", "moderate", "Client will be disconnected but can reconnect immediately.",
+        "kick", ":boot: Client {mac} has been disconnected.",
+    ),
+    "block": _AdminCommand(
+        "Block", "dangerous",
+        "Client will be permanently blocked from the network until manually unblocked.",
+        "block", ":no_entry: Client {mac} has been blocked.",
+    ),
+}
+
+
+# Membership pre-checks so unknown commands are rejected before any lookup
+_VALID_DEVICE_COMMANDS = frozenset(_DEVICE_COMMANDS)
+_VALID_CLIENT_COMMANDS = frozenset(_CLIENT_COMMANDS)
+
+
+# Firewall rule result templates keyed by the new enabled state
+_FIREWALL_RESULT_MESSAGES = {
+    True: ":white_check_mark: Firewall rule '{name}' has been enabled.",
+    False: ":no_entry: Firewall rule '{name}' has been disabled.",
+}
+
+
 async def device_admin_command(
     mac_address: str,
     command: str,
@@ -733,39 +1008,18 @@ async def device_admin_command(
     Returns:
         Result string or ConfirmationRequired if confirmation needed
     """
-    api = get_controller_api()
-
-    # Define risk levels for each command
-    risk_map = {
-        "locate": None,  # Safe - no confirmation needed
-        "restart": "moderate",
-        "adopt": "moderate",
-        "upgrade": "dangerous",
-        "forget": "critical",
-        "delete": "critical",
-    }
-
-    impact_map = {
-        "locate": None,
-        "restart": "Device will reboot. Connected clients will be disconnected for ~1-2 minutes.",
-        "adopt": "Device will be adopted and added to your controller.",
-        "upgrade": "Firmware upgrade will begin. Device will be unavailable for several minutes during the upgrade.",
-        "forget": "Device will be removed from the controller. You will need to re-adopt it to manage it again.",
-        "delete": "Device will be removed from the controller. You will need to re-adopt it to manage it again.",
-    }
-
-    cmd = command.lower()
-    risk_level = risk_map.get(cmd)
-
     # Validate command
-    if cmd not in risk_map:
+    cmd = command.casefold()
+    if cmd not in _VALID_DEVICE_COMMANDS:
         return f"Unknown command: {command}. Valid commands: locate, restart, adopt, upgrade, forget"
+    spec = _DEVICE_COMMANDS[cmd]
 
     # Safe commands execute immediately
-    if risk_level is None:
+    if spec.risk_level is None:
+        api = get_controller_api()
         try:
-            await api.device_command(mac_address, cmd)
-            return f":flashlight: LED on device {mac_address} is now blinking for identification."
+            await api.device_command(mac_address, spec.api_cmd)
+            return spec.result.format(mac=mac_address)
         except Exception as e:
             return f"Error executing command: {str(e)}"
 
@@ -775,33 +1029,21 @@ async def device_admin_command(
         return ConfirmationRequired(
             tool_name="device_admin_command",
             tool_args={"mac_address": mac_address, "command": command},
-            risk_level=risk_level,
-            description=f"{command.title()} device {mac_address}",
-            impact=impact_map.get(cmd, "This action may affect network connectivity."),
+            risk_level=spec.risk_level,
+            description=f"{spec.title} device {mac_address}",
+            impact=spec.impact,
         )
 
     # Verify token and execute
-    store = get_confirmation_store()
-    if store is None:
-        return "Error: Confirmation system not initialized."
-
-    valid_args = store.validate_token("device_admin_command", confirm_token)
-    if not valid_args:
-        return "Error: Invalid or expired confirmation token. Please request the action again."
+    token_error = await _consume_confirm_token("device_admin_command", confirm_token)
+    if token_error:
+        return token_error
 
+    api = get_controller_api()
     try:
-        # Map 'forget' to 'delete' for the API
-        api_cmd = "delete" if cmd == "forget" else cmd
-        await api.device_command(mac_address, api_cmd)
-
-        result_messages = {
-            "restart": f":arrows_counterclockwise: Device {mac_address} is restarting.",
-            "adopt": f":heavy_plus_sign: Device {mac_address} is being adopted.",
-            "upgrade": f":arrow_up: Firmware upgrade started on {mac_address}.",
-            "forget": f":wastebasket: Device {mac_address} has been removed from the controller.",
-            "delete": f":wastebasket: Device {mac_address} has been removed from the controller.",
-        }
-        return result_messages.get(cmd, f"Command {command} executed on {mac_address}.")
+        await api.device_command(mac_address, spec.api_cmd)
+        clear_tool_cache()
+        return spec.result.format(mac=mac_address)
     except Exception as e:
         return f"Error executing {command}: {str(e)}"
 
@@ -821,31 +1063,17 @@ async def client_admin_command(
     Returns:
         Result string or ConfirmationRequired if confirmation needed
     """
-    api = get_controller_api()
-
-    risk_map = {
-        "unblock": None,  # Safe - no confirmation needed
-        "kick": "moderate",
-        "block": "dangerous",
-    }
-
-    impact_map = {
-        "unblock": None,
-        "kick": "Client will be disconnected but can reconnect immediately.",
-        "block": "Client will be permanently blocked from the network until manually unblocked.",
-    }
-
-    cmd = command.lower()
-    risk_level = risk_map.get(cmd)
-
-    if cmd not in risk_map:
+    cmd = command.casefold()
+    if cmd not in _VALID_CLIENT_COMMANDS:
         return f"Unknown command: {command}. Valid commands: kick, block, unblock"
+    spec = _CLIENT_COMMANDS[cmd]
 
     # Safe commands execute immediately
-    if risk_level is None:
+    if spec.risk_level is None:
+        api = get_controller_api()
         try:
-            await api.client_command(mac_address, cmd)
-            return f":white_check_mark: Client {mac_address} has been unblocked."
+            await api.client_command(mac_address, spec.api_cmd)
+            return spec.result.format(mac=mac_address)
         except Exception as e:
             return f"Error executing command: {str(e)}"
 
@@ -854,28 +1082,20 @@ async def client_admin_command(
         return ConfirmationRequired(
             tool_name="client_admin_command",
             tool_args={"mac_address": mac_address, "command": command},
-            risk_level=risk_level,
-            description=f"{command.title()} client {mac_address}",
-            impact=impact_map.get(cmd, "This action will affect the client's network access."),
+            risk_level=spec.risk_level,
+            description=f"{spec.title} client {mac_address}",
+            impact=spec.impact,
         )
 
     # Verify token and execute
-    store = get_confirmation_store()
-    if store is None:
-        return "Error: Confirmation system not initialized."
-
-    valid_args = store.validate_token("client_admin_command", confirm_token)
-    if not valid_args:
-        return "Error: Invalid or expired confirmation token. Please request the action again."
+    token_error = await _consume_confirm_token("client_admin_command", confirm_token)
+    if token_error:
+        return token_error
 
+    api = get_controller_api()
     try:
-        await api.client_command(mac_address, cmd)
-
-        result_messages = {
-            "kick": f":boot: Client {mac_address} has been disconnected.",
-            "block": f":no_entry: Client {mac_address} has been blocked.",
-        }
-        return result_messages.get(cmd, f"Command {command} executed on {mac_address}.")
+        await api.client_command(mac_address, spec.api_cmd)
+        return spec.result.format(mac=mac_address)
     except Exception as e:
         return f"Error executing {command}: {str(e)}"
 
@@ -939,8 +1159,6 @@ async def update_wlan_settings(
     Returns:
         Result string or ConfirmationRequired if confirmation needed
     """
-    api = get_controller_api()
-
     # Determine risk level based on changes
     if password is not None:
         risk_level = "dangerous"
@@ -960,16 +1178,24 @@ async def update_wlan_settings(
     # Safe operations execute immediately
     if risk_level is None:
         try:
+            api = get_controller_api()
             wlan = await api.get_wlan_by_name(wlan_name)
             if not wlan:
                 return f"WLAN '{wlan_name}' not found."
             await api.update_wlan(wlan["_id"], enabled=True)
+            clear_tool_cache()
             return f":white_check_mark: WLAN '{wlan_name}' has been enabled."
         except Exception as e:
             return f"Error updating WLAN: {str(e)}"
 
     # Operations requiring confirmation
     if confirm_token is None:
+        # Fail fast on unknown names; the WLAN list stays cached for the update
+        try:
+            if not await get_controller_api().get_wlan_by_name(wlan_name):
+                return f"WLAN '{wlan_name}' not found."
+        except Exception as e:
+            return f"Error updating WLAN: {str(e)}"
         return ConfirmationRequired(
             tool_name="update_wlan_settings",
             tool_args={
@@ -983,15 +1209,12 @@ async def update_wlan_settings(
         )
 
     # Verify token and execute
-    store = get_confirmation_store()
-    if store is None:
-        return "Error: Confirmation system not initialized."
-
-    valid_args = store.validate_token("update_wlan_settings", confirm_token)
-    if not valid_args:
-        return "Error: Invalid or expired confirmation token. Please request the action again."
+    token_error = await _consume_confirm_token("update_wlan_settings", confirm_token)
+    if token_error:
+        return token_error
 
     try:
+        api = get_controller_api()
         wlan = await api.get_wlan_by_name(wlan_name)
         if not wlan:
             return f"WLAN '{wlan_name}' not found."
@@ -1003,6 +1226,7 @@ async def update_wlan_settings(
             updates["x_passphrase"] = password
 
         await api.update_wlan(wlan["_id"], **updates)
+        clear_tool_cache()
 
         if password is not None:
             return f":key: Password changed for WLAN '{wlan_name}'."
@@ -1029,8 +1253,6 @@ async def update_firewall_rule_settings(
     Returns:
         Result string or ConfirmationRequired if confirmation needed
     """
-    api = get_controller_api()
-
     if enabled is None:
         return "No changes specified. Provide 'enabled' parameter."
 
@@ -1040,6 +1262,12 @@ async def update_firewall_rule_settings(
     impact = "Changing firewall rules may affect network security and traffic flow."
 
     if confirm_token is None:
+        # Fail fast on unknown names; the rule list stays cached for the update
+        try:
+            if not await get_controller_api().get_firewall_rule_by_name(rule_name):
+                return f"Firewall rule '{rule_name}' not found."
+        except Exception as e:
+            return f"Error updating firewall rule: {str(e)}"
         return ConfirmationRequired(
             tool_name="update_firewall_rule_settings",
             tool_args={"rule_name": rule_name, "enabled": enabled},
@@ -1049,29 +1277,26 @@ async def update_firewall_rule_settings(
         )
 
     # Verify token and execute
-    store = get_confirmation_store()
-    if store is None:
-        return "Error: Confirmation system not initialized."
-
-    valid_args = store.validate_token("update_firewall_rule_settings", confirm_token)
-    if not valid_args:
-        return "Error: Invalid or expired confirmation token. Please request the action again."
+    token_error = await _consume_confirm_token("update_firewall_rule_settings", confirm_token)
+    if token_error:
+        return token_error
 
     try:
+        api = get_controller_api()
         rule = await api.get_firewall_rule_by_name(rule_name)
         if not rule:
             return f"Firewall rule '{rule_name}' not found."
 
         await api.update_firewall_rule(rule["_id"], enabled=enabled)
+        clear_tool_cache()
 
-        icon = ":white_check_mark:" if enabled else ":no_entry:"
-        status = "enabled" if enabled else "disabled"
-        return f"{icon} Firewall rule '{rule_name}' has been {status}."
+        return _FIREWALL_RESULT_MESSAGES[bool(enabled)].format(name=rule_name)
     except Exception as e:
         return f"Error updating firewall rule: {str(e)}"
 
 
-# Tool metadata for registration
+# Tool metadata for registration. "read_only" marks tools with no side
+# effects; only those may start before the model's turn has finished
 TOOL_DEFINITIONS = [
     # ========== Existing Read Tools ==========
     {
@@ -1079,6 +1304,7 @@ TOOL_DEFINITIONS = [
         "description": "Get list of all UniFi sites available",
         "parameters": {},
         "function": get_unifi_sites,
+        "read_only": True,
     },
     {
         "name": "get_unifi_devices",
@@ -1091,6 +1317,7 @@ TOOL_DEFINITIONS = [
             }
         },
         "function": get_unifi_devices,
+        "read_only": True,
     },
     {
         "name": "get_device_details",
@@ -1103,24 +1330,41 @@ TOOL_DEFINITIONS = [
             }
         },
         "function": get_device_details,
+        "read_only": True,
     },
     {
         "name": "get_network_config",
         "description": "Get network/VLAN configuration for the site",
         "parameters": {},
         "function": get_network_config,
+        "read_only": True,
     },
     {
         "name": "get_wlan_config",
         "description": "Get wireless network (SSID) configuration including security settings",
         "parameters": {},
         "function": get_wlan_config,
+        "read_only": True,
     },
     {
         "name": "get_firewall_rules",
         "description": "Get firewall rules for the site",
         "parameters": {},
         "function": get_firewall_rules,
+        "read_only": True,
+    },
+    {
+        "name": "get_audit_snapshot",
+        "description": "Get network, WLAN, firewall, and device configuration together in one call. Prefer this over the individual tools for security audits.",
+        "parameters": {
+            "site_id": {
+                "type": "string",
+                "description": "Optional site ID for the device list. If not provided, uses default site.",
+                "required": False,
+            }
+        },
+        "function": get_audit_snapshot,
+        "read_only": True,
     },
     {
         "name": "search_knowledge_base",
@@ -1133,6 +1377,7 @@ TOOL_DEFINITIONS = [
             }
         },
         "function": search_knowledge_base,
+        "read_only": True,
     },
     # ========== New Read Tools (Phase 1) ==========
     {
@@ -1151,6 +1396,7 @@ TOOL_DEFINITIONS = [
             },
         },
         "function": get_connected_clients,
+        "read_only": True,
     },
     {
         "name": "get_client_details",
@@ -1163,6 +1409,7 @@ TOOL_DEFINITIONS = [
             }
         },
         "function": get_client_details,
+        "read_only": True,
     },
     {
         "name": "get_traffic_stats",
@@ -1175,12 +1422,14 @@ TOOL_DEFINITIONS = [
             }
         },
         "function": get_traffic_stats,
+        "read_only": True,
     },
     {
         "name": "get_dpi_stats",
         "description": "Get Deep Packet Inspection statistics showing traffic by application category",
         "parameters": {},
         "function": get_dpi_stats,
+        "read_only": True,
     },
     {
         "name": "get_top_clients",
@@ -1198,6 +1447,7 @@ TOOL_DEFINITIONS = [
             },
         },
         "function": get_top_clients,
+        "read_only": True,
     },
     {
         "name": "get_recent_events",
@@ -1215,6 +1465,7 @@ TOOL_DEFINITIONS = [
             },
         },
         "function": get_recent_events,
+        "read_only": True,
     },
     {
         "name": "get_alarms",
@@ -1227,6 +1478,20 @@ TOOL_DEFINITIONS = [
             }
         },
         "function": get_alarms,
+        "read_only": True,
+    },
+    {
+        "name": "get_network_overview",
+        "description": "Get connected clients, traffic statistics, top applications, and active alarms together in one call. Prefer this over the individual tools for a general status overview.",
+        "parameters": {
+            "hours": {
+                "type": "integer",
+                "description": "Number of hours of traffic stats to include (default: 24)",
+                "required": False,
+            }
+        },
+        "function": get_network_overview,
+        "read_only": True,
     },
     # ========== Administrative Tools (Phase 3) ==========
     {
@@ -1350,3 +1615,6 @@ TOOL_DEFINITIONS = [
         "function": update_firewall_rule_settings,
     },
 ]
+
+# Name -> tool definition, for O(1) dispatch
+TOOL_BY_NAME: dict[str, dict] = {tool_def["name"]: tool_def for tool_def in TOOL_DEFINITIONS}
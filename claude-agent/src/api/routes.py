@@ -1,20 +1,146 @@
 """FastAPI routes for n8n integration and health checks."""
 
+import asyncio
+import hashlib
+import json
 import logging
-from typing import Any
+from collections.abc import AsyncIterator, Awaitable, Callable
+from typing import TYPE_CHECKING, Annotated, Any
 
-from fastapi import APIRouter, HTTPException, Request
-from pydantic import BaseModel
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel, ConfigDict
+
+# Type-only: the instances live on app.state, and importing these modules
+# would pull chromadb, numpy and the tool registry into every route import
+if TYPE_CHECKING:
+    from ..agent.core import UniFiExpertAgent
+    from ..knowledge.embeddings import KnowledgeBase
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
 
+# Dependencies
+
+def require_agent(request: Request) -> "UniFiExpertAgent":
+    """Get the initialized agent, or fail the request with 503."""
+    agent = getattr(request.app.state, "agent", None)
+    if agent is None:
+        raise HTTPException(status_code=503, detail="Agent not initialized")
+    return agent
+
+
+def require_knowledge_base(request: Request) -> "KnowledgeBase":
+    """Get the initialized knowledge base, or fail the request with 503."""
+    kb = getattr(request.app.state, "knowledge_base", None)
+    if kb is None:
+        raise HTTPException(status_code=503, detail="Knowledge base not initialized")
+    return kb
+
+
+AgentDep = Annotated["UniFiExpertAgent", Depends(require_agent)]
+KnowledgeBaseDep = Annotated["KnowledgeBase", Depends(require_knowledge_base)]
+
+
+# Conditional responses for polled endpoints
+
+def _conditional_json(req: Request, payload: dict[str, Any]) -> Response:
+    """Serve a JSON payload with an ETag, answering 304 if the client has it.
+
+    Args:
+        req: Incoming request, checked for If-None-Match
+        payload: JSON-serializable response body
+
+    Returns:
+        200 response with the body, or an empty 304
+    """
+    body = json.dumps(payload, separators=(",", ":")).encode()
+    etag = f'"{hashlib.blake2b(body, digest_size=8).hexdigest()}"'
+    headers = {"ETag": etag, "Cache-Control": "max-age=5"}
+    if req.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers=headers)
+    return Response(body, media_type="application/json", headers=headers)
+
+
+# Server-Sent Events streaming
+
+def _wants_event_stream(req: Request) -> bool:
+    """Check whether the client asked for a text/event-stream response."""
+    return "text/event-stream" in req.headers.get("accept", "")
+
+
+def _sse(event: str, data: dict[str, Any]) -> str:
+    """Format one Server-Sent Event."""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+def _stream_agent_response(
+    run: Callable[[Callable[[str], Awaitable[None]]], Awaitable[str]],
+    result_key: str,
+) -> StreamingResponse:
+    """Stream an agent call as Server-Sent Events.
+
+    Emits ``text`` events with each new chunk of model output (``reset`` is
+    set when a new model turn starts over), then a final ``done`` event
+    carrying the same fields as the JSON response, or an ``error`` event.
+
+    Args:
+        run: Starts the agent call, given the on_text callback to stream through
+        result_key: Field name for the final text in the ``done`` event
+
+    Returns:
+        StreamingResponse with media type text/event-stream
+    """
+    async def events() -> AsyncIterator[str]:
+        queue: asyncio.Queue[str | None] = asyncio.Queue()
+        sent = ""
+
+        async def on_text(text: str) -> None:
+            nonlocal sent
+            if text.startswith(sent):
+                payload = {"delta": text[len(sent):]}
+            else:
+                payload = {"delta": text, "reset": True}
+            sent = text
+            queue.put_nowait(_sse("text", payload))
+
+        async def produce() -> None:
+            try:
+                result = await run(on_text)
+                queue.put_nowait(_sse("done", {result_key: result, "success": True}))
+            except Exception as e:
+                logger.error(f"Streaming error: {e}")
+                queue.put_nowait(_sse("error", {"detail": str(e), "success": False}))
+            finally:
+                queue.put_nowait(None)
+
+        task = asyncio.create_task(produce())
+        try:
+            while (event := await queue.get()) is not None:
+                yield event
+        finally:
+            # Client disconnected early: stop the agent call
+            task.cancel()
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache"},
+    )
+
+
 # Request/Response Models
 
+# Request bodies reject unknown fields, so a misspelled key fails with 422
+# instead of being silently ignored
+_REQUEST_CONFIG = ConfigDict(extra="forbid", frozen=True)
+
+
 class QueryRequest(BaseModel):
     """General query request."""
+    model_config = _REQUEST_CONFIG
     prompt: str
     context: dict[str, Any] | None = None
 
@@ -27,6 +153,7 @@ class QueryResponse(BaseModel):
 
 class HealthAnalysisRequest(BaseModel):
     """Request for health analysis from n8n workflow."""
+    model_config = _REQUEST_CONFIG
     devices: list[dict[str, Any]]
     summary: str
 
@@ -39,6 +166,7 @@ class HealthAnalysisResponse(BaseModel):
 
 class AuditAnalysisRequest(BaseModel):
     """Request for audit analysis from n8n workflow."""
+    model_config = _REQUEST_CONFIG
     networks: list[dict[str, Any]]
     wlans: list[dict[str, Any]]
     firewall_rules: list[dict[str, Any]]
@@ -54,6 +182,7 @@ class AuditAnalysisResponse(BaseModel):
 
 class KnowledgeSearchRequest(BaseModel):
     """Request for knowledge base search."""
+    model_config = _REQUEST_CONFIG
     query: str
     n_results: int = 5
 
@@ -73,29 +202,36 @@ async def health_check() -> dict[str, str]:
 
 
 @router.get("/ready")
-async def readiness_check(request: Request) -> dict[str, Any]:
+async def readiness_check(request: Request) -> Response:
     """Readiness check with component status."""
     agent = getattr(request.app.state, "agent", None)
     kb = getattr(request.app.state, "knowledge_base", None)
 
-    return {
+    return _conditional_json(request, {
         "status": "ready" if agent else "initializing",
         "components": {
             "agent": "ready" if agent else "not initialized",
             "knowledge_base": kb.get_stats() if kb else {"status": "not initialized"},
         },
-    }
+    })
 
 
 @router.post("/query", response_model=QueryResponse)
-async def query_agent(request: QueryRequest, req: Request) -> QueryResponse:
+async def query_agent(
+    request: QueryRequest,
+    req: Request,
+    agent: AgentDep,
+) -> QueryResponse | StreamingResponse:
     """General query endpoint for the agent.
 
-    Use this endpoint for ad-hoc questions to the UniFi Expert.
+    Use this endpoint for ad-hoc questions to the UniFi Expert. Send
+    ``Accept: text/event-stream`` to receive the response as it is generated.
     """
-    agent = getattr(req.app.state, "agent", None)
-    if not agent:
-        raise HTTPException(status_code=503, detail="Agent not initialized")
+    if _wants_event_stream(req):
+        return _stream_agent_response(
+            lambda on_text: agent.query(request.prompt, request.context, on_text=on_text),
+            "response",
+        )
 
     try:
         response = await agent.query(request.prompt, request.context)
@@ -106,16 +242,15 @@ async def query_agent(request: QueryRequest, req: Request) -> QueryResponse:
 
 
 @router.post("/analyze/health", response_model=HealthAnalysisResponse)
-async def analyze_health(request: HealthAnalysisRequest, req: Request) -> HealthAnalysisResponse:
+async def analyze_health(
+    request: HealthAnalysisRequest,
+    agent: AgentDep,
+) -> HealthAnalysisResponse:
     """Analyze device health data from n8n workflow.
 
     This endpoint is called by the Unifi Health to Slack workflow
     to get AI-powered analysis and recommendations.
     """
-    agent = getattr(req.app.state, "agent", None)
-    if not agent:
-        raise HTTPException(status_code=503, detail="Agent not initialized")
-
     try:
         analysis = await agent.analyze_health(request.devices, request.summary)
         return HealthAnalysisResponse(analysis=analysis, success=True)
@@ -125,24 +260,32 @@ async def analyze_health(request: HealthAnalysisRequest, req: Request) -> Health
 
 
 @router.post("/analyze/audit", response_model=AuditAnalysisResponse)
-async def analyze_audit(request: AuditAnalysisRequest, req: Request) -> AuditAnalysisResponse:
+async def analyze_audit(
+    request: AuditAnalysisRequest,
+    req: Request,
+    agent: AgentDep,
+) -> AuditAnalysisResponse | StreamingResponse:
     """Analyze security audit results from n8n workflow.
 
     This endpoint is called by the Unifi Best Practices Audit workflow
-    to get AI-powered remediation recommendations.
+    to get AI-powered remediation recommendations. Send
+    ``Accept: text/event-stream`` to receive them as they are generated.
     """
-    agent = getattr(req.app.state, "agent", None)
-    if not agent:
-        raise HTTPException(status_code=503, detail="Agent not initialized")
-
-    try:
-        recommendations = await agent.analyze_audit(
+    def run(on_text: Callable[[str], Awaitable[None]] | None = None) -> Awaitable[str]:
+        return agent.analyze_audit(
             findings=request.findings,
-            networks=request.networks,
-            wlans=request.wlans,
-            firewall_rules=request.firewall_rules,
-            devices=request.devices,
+            network_count=len(request.networks),
+            wlan_count=len(request.wlans),
+            firewall_count=len(request.firewall_rules),
+            device_count=len(request.devices),
+            on_text=on_text,
         )
+
+    if _wants_event_stream(req):
+        return _stream_agent_response(run, "recommendations")
+
+    try:
+        recommendations = await run()
         return AuditAnalysisResponse(recommendations=recommendations, success=True)
     except Exception as e:
         logger.error(f"Audit analysis error: {e}")
@@ -150,15 +293,14 @@ async def analyze_audit(request: AuditAnalysisRequest, req: Request) -> AuditAna
 
 
 @router.post("/knowledge/search", response_model=KnowledgeSearchResponse)
-async def search_knowledge(request: KnowledgeSearchRequest, req: Request) -> KnowledgeSearchResponse:
+async def search_knowledge(
+    request: KnowledgeSearchRequest,
+    kb: KnowledgeBaseDep,
+) -> KnowledgeSearchResponse:
     """Search the knowledge base directly.
 
     Useful for testing or building custom integrations.
     """
-    kb = getattr(req.app.state, "knowledge_base", None)
-    if not kb:
-        raise HTTPException(status_code=503, detail="Knowledge base not initialized")
-
     try:
         results = await kb.search(request.query, request.n_results)
         return KnowledgeSearchResponse(results=results, success=True)
@@ -168,10 +310,10 @@ async def search_knowledge(request: KnowledgeSearchRequest, req: Request) -> Kno
 
 
 @router.get("/knowledge/stats")
-async def knowledge_stats(req: Request) -> dict[str, Any]:
+async def knowledge_stats(req: Request) -> Response:
     """Get knowledge base statistics."""
     kb = getattr(req.app.state, "knowledge_base", None)
     if not kb:
-        return {"status": "not initialized"}
+        return _conditional_json(req, {"status": "not initialized"})
 
-    return kb.get_stats()
+    return _conditional_json(req, kb.get_stats())
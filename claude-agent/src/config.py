@@ -2,12 +2,20 @@
 
 from functools import lru_cache
 
-from pydantic_settings import BaseSettings
+from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
 class Settings(BaseSettings):
     """Application settings loaded from environment variables."""
 
+    # Frozen: settings are read on every request and never reassigned at runtime
+    model_config = SettingsConfigDict(
+        env_file=".env",
+        env_file_encoding="utf-8",
+        case_sensitive=True,
+        frozen=True,
+    )
+
     # Anthropic
     ANTHROPIC_API_KEY: str = ""
 
@@ -38,15 +46,17 @@ class Settings(BaseSettings):
     DUO_SECRET_KEY: str = ""  # Duo Auth API secret key (skey)
     DUO_API_HOST: str = ""  # Duo API hostname (e.g., api-XXXXXXXX.duosecurity.com)
     DUO_MFA_USER: str = ""  # User to send push notifications to (e.g., jon@freed.dev)
+    DUO_POOL_SIZE: int = 8  # Worker threads for blocking Duo API calls
+
+    # Anthropic prompt caching
+    PROMPT_CACHE_HEARTBEAT: bool = False  # Periodically refresh the 1h prompt cache
+    PROMPT_CACHE_HEARTBEAT_MINUTES: int = 55  # Heartbeat interval (must stay under 60)
+    # Reference docs in the system prompt (0 disables); the bundled docs are ~24 KB
+    PROMPT_KNOWLEDGE_MAX_CHARS: int = 32_000
 
     # Logging
     LOG_LEVEL: str = "INFO"
 
-    class Config:
-        env_file = ".env"
-        env_file_encoding = "utf-8"
-        case_sensitive = True
-
 
 @lru_cache
 def get_settings() -> Settings:
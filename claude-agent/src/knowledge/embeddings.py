@@ -1,11 +1,17 @@
 """ChromaDB-based knowledge base for RAG."""
 
+import asyncio
 import hashlib
 import logging
+import time
+from collections import OrderedDict
+from collections.abc import Callable
 from pathlib import Path
 from typing import Any
 
 import chromadb
+import numpy as np
+from chromadb.utils import embedding_functions
 
 from ..config import settings
 
@@ -26,6 +32,92 @@ def set_knowledge_base(kb: "KnowledgeBase") -> None:
     _knowledge_base = kb
 
 
+class SemanticCache:
+    """LRU cache of search results keyed by query embedding.
+
+    A query whose embedding has cosine similarity >= ``threshold`` with a
+    cached query's embedding reuses that query's results, so rephrasings
+    ("what is WPA3?" / "explain WPA3") skip the vector DB.
+    """
+
+    def __init__(self, max_size: int = 256, ttl_seconds: float = 900, threshold: float = 0.95):
+        """Initialize the cache.
+
+        Args:
+            max_size: Maximum number of cached queries
+            ttl_seconds: Seconds before an entry goes stale
+            threshold: Minimum cosine similarity for a hit
+        """
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self.threshold = threshold
+        # key -> (unit embedding, expires_at, n_results, results)
+        self._entries: OrderedDict[int, tuple[np.ndarray, float, int, list]] = OrderedDict()
+        self._next_key = 0
+        self._keys: list[int] = []
+        self._matrix: np.ndarray | None = None
+
+    def _evict_expired(self, now: float) -> None:
+        """Drop stale entries and invalidate the stacked matrix if any left."""
+        expired = [key for key, entry in self._entries.items() if entry[1] <= now]
+        for key in expired:
+            del self._entries[key]
+        if expired:
+            self._matrix = None
+
+    def get(self, embedding: np.ndarray, n_results: int) -> list[dict[str, Any]] | None:
+        """Find cached results for a semantically similar query.
+
+        Args:
+            embedding: Unit-normalized query embedding
+            n_results: Number of results requested
+
+        Returns:
+            Cached results, or None on a miss
+        """
+        self._evict_expired(time.monotonic())
+        if not self._entries:
+            return None
+
+        if self._matrix is None:
+            self._keys = list(self._entries)
+            self._matrix = np.stack([self._entries[key][0] for key in self._keys])
+
+        similarities = self._matrix @ embedding
+        best = int(np.argmax(similarities))
+        key = self._keys[best]
+        _, _, cached_n, results = self._entries[key]
+        if similarities[best] < self.threshold or cached_n != n_results:
+            return None
+
+        self._entries.move_to_end(key)
+        return results
+
+    def clear(self) -> None:
+        """Drop all cached results."""
+        self._entries.clear()
+        self._matrix = None
+
+    def put(self, embedding: np.ndarray, n_results: int, results: list[dict[str, Any]]) -> None:
+        """Cache results for a query embedding.
+
+        Args:
+            embedding: Unit-normalized query embedding
+            n_results: Number of results requested
+            results: Formatted search results
+        """
+        if len(self._entries) >= self.max_size:
+            self._entries.popitem(last=False)
+        self._entries[self._next_key] = (
+            embedding,
+            time.monotonic() + self.ttl_seconds,
+            n_results,
+            results,
+        )
+        self._next_key += 1
+        self._matrix = None
+
+
 class KnowledgeBase:
     """ChromaDB-based knowledge base for storing and searching documentation."""
 
@@ -38,6 +130,15 @@ class KnowledgeBase:
         self.knowledge_dir = Path(knowledge_dir)
         self.client: chromadb.HttpClient | None = None
         self.collection = None
+        # Same model Chroma uses by default, shared with the semantic cache
+        self.embedding_function = embedding_functions.DefaultEmbeddingFunction()
+        self.search_cache = SemanticCache()
+        # (query, n_results) -> running search, shared by identical concurrent calls
+        self._inflight: dict[tuple[str, int], asyncio.Task] = {}
+        # Collection size, fetched lazily and reset whenever this instance adds documents
+        self._document_count: int | None = None
+        # Largest insert Chroma accepts; replaced with the server's limit on connect
+        self.max_batch_size = 5461
 
     async def initialize(self) -> None:
         """Initialize connection to ChromaDB and index documents."""
@@ -49,10 +150,17 @@ class KnowledgeBase:
                 port=settings.CHROMADB_PORT,
             )
 
+            # get_max_batch_size() replaced the max_batch_size property in Chroma 0.5
+            get_max_batch_size = getattr(self.client, "get_max_batch_size", None)
+            self.max_batch_size = (
+                get_max_batch_size() if get_max_batch_size else self.client.max_batch_size
+            )
+
             # Get or create collection
             self.collection = self.client.get_or_create_collection(
                 name="unifi_knowledge",
                 metadata={"hnsw:space": "cosine"},
+                embedding_function=self.embedding_function,
             )
 
             logger.info(f"Collection 'unifi_knowledge' ready with {self.collection.count()} documents")
@@ -60,6 +168,9 @@ class KnowledgeBase:
             # Index knowledge files
             await self._index_knowledge_files()
 
+            # Load the embedding model now rather than on the first user query
+            self._warm_up()
+
             # Set global instance
             set_knowledge_base(self)
 
@@ -67,59 +178,152 @@ class KnowledgeBase:
             logger.error(f"Failed to initialize ChromaDB: {e}")
             raise
 
+    def _warm_up(self) -> None:
+        """Run a throwaway query so the embedding function loads at startup.
+
+        Chroma loads its embedding model lazily on first use, which would
+        otherwise land on the first search_knowledge_base call.
+        """
+        try:
+            self.collection.query(query_texts=["warm up"], n_results=1)
+        except Exception as e:
+            logger.warning(f"Knowledge base warm-up query failed: {e}")
+
     async def _index_knowledge_files(self) -> None:
-        """Index all markdown files in the knowledge directory."""
+        """Index all markdown files in the knowledge directory.
+
+        Every chunk records its file's mtime and size, so files unchanged
+        since they were indexed are skipped without being read. Changed
+        files are read and chunked concurrently in worker threads, and the
+        whole directory is written in batched calls. Chunks that are no
+        longer produced (edited or removed files) are deleted, so the
+        collection tracks the directory.
+        """
         if not self.knowledge_dir.exists():
             logger.warning(f"Knowledge directory not found: {self.knowledge_dir}")
             return
 
-        indexed_count = 0
+        indexed = self._indexed_chunks()
+        indexed_files = {
+            (meta["source"], meta.get("mtime_ns"), meta.get("size")) for meta in indexed.values()
+        }
+
+        unchanged: set[str] = set()
+        changed: list[Path] = []
         for md_file in self.knowledge_dir.glob("*.md"):
-            count = await self._index_file(md_file)
-            indexed_count += count
+            stat = md_file.stat()
+            if (md_file.name, stat.st_mtime_ns, stat.st_size) in indexed_files:
+                unchanged.add(md_file.name)
+            else:
+                changed.append(md_file)
+
+        per_file = await asyncio.gather(*(
+            asyncio.to_thread(self._chunks_for_file, md_file) for md_file in changed
+        ))
+
+        ids: list[str] = []
+        documents: list[str] = []
+        metadatas: list[dict[str, Any]] = []
+        for file_ids, file_documents, file_metadatas in per_file:
+            ids.extend(file_ids)
+            documents.extend(file_documents)
+            metadatas.extend(file_metadatas)
+
+        current = {doc_id for doc_id, meta in indexed.items() if meta["source"] in unchanged}
+        current.update(ids)
+        stale = [doc_id for doc_id in indexed if doc_id not in current]
+        new = [j for j, doc_id in enumerate(ids) if doc_id not in indexed]
+        # Chunks of a changed file that are already indexed only need the new file stat
+        restat = [j for j, doc_id in enumerate(ids) if doc_id in indexed]
+
+        self._in_batches(self.collection.delete, stale)
+        self._in_batches(
+            self.collection.add,
+            [ids[j] for j in new],
+            documents=[documents[j] for j in new],
+            metadatas=[metadatas[j] for j in new],
+        )
+        self._in_batches(
+            self.collection.update,
+            [ids[j] for j in restat],
+            metadatas=[metadatas[j] for j in restat],
+        )
+        if new or stale:
+            self._document_count = None
 
-        logger.info(f"Indexed {indexed_count} chunks from knowledge files")
+        logger.info(
+            f"Indexed {len(new)} chunks from {len(changed)} changed knowledge files, "
+            f"removed {len(stale)} stale"
+        )
 
-    async def _index_file(self, file_path: Path) -> int:
-        """Index a single markdown file.
+    def _chunks_for_file(
+        self,
+        file_path: Path,
+    ) -> tuple[list[str], list[str], list[dict[str, Any]]]:
+        """Split a markdown file into chunks ready for indexing.
 
         Args:
             file_path: Path to the markdown file
 
         Returns:
-            Number of chunks indexed
+            Parallel lists of chunk IDs, chunk texts and chunk metadata
         """
-        content = file_path.read_text(encoding="utf-8")
+        stat = file_path.stat()
+        # One read and one decode; splitlines() in the chunker handles \r\n,
+        # so text-mode newline translation isn't needed
+        content = file_path.read_bytes().decode("utf-8")
         chunks = self._split_into_chunks(content)
 
-        indexed = 0
+        # Create deterministic IDs based on file, chunk position and content,
+        # so an edited chunk gets a new ID and its old version is pruned
+        ids, documents, metadatas = [], [], []
         for i, chunk in enumerate(chunks):
             if not chunk.strip():
                 continue
+            key = f"{file_path.name}:{i}:{chunk}"
+            ids.append(hashlib.md5(key.encode(), usedforsecurity=False).hexdigest())
+            documents.append(chunk)
+            metadatas.append({
+                "source": file_path.name,
+                "chunk_index": i,
+                "mtime_ns": stat.st_mtime_ns,
+                "size": stat.st_size,
+            })
 
-            # Create deterministic ID based on file and chunk position
-            doc_id = hashlib.md5(f"{file_path.name}:{i}".encode()).hexdigest()
+        return ids, documents, metadatas
 
-            # Check if already indexed
-            existing = self.collection.get(ids=[doc_id])
-            if existing["ids"]:
-                continue
+    def _indexed_chunks(self) -> dict[str, dict[str, Any]]:
+        """Get the metadata of every indexed knowledge file chunk.
 
-            # Add to collection
-            self.collection.add(
-                documents=[chunk],
-                metadatas=[{
-                    "source": file_path.name,
-                    "chunk_index": i,
-                }],
-                ids=[doc_id],
-            )
-            indexed += 1
+        Only file chunks carry a chunk_index, so documents added through
+        add_document are left alone.
 
-        if indexed > 0:
-            logger.debug(f"Indexed {indexed} new chunks from {file_path.name}")
+        Returns:
+            Mapping of chunk ID to chunk metadata
+        """
+        # Metadata only, without loading the documents themselves
+        result = self.collection.get(where={"chunk_index": {"$gte": 0}}, include=["metadatas"])
+        return dict(zip(result["ids"], result["metadatas"]))
 
-        return indexed
+    def _in_batches(
+        self,
+        operation: Callable[..., Any],
+        ids: list[str],
+        **columns: list[Any],
+    ) -> None:
+        """Run a collection write in slices no larger than Chroma's batch limit.
+
+        Args:
+            operation: Collection method to call, e.g. self.collection.add
+            ids: Document IDs
+            **columns: Lists parallel to ids, e.g. documents and metadatas
+        """
+        step = self.max_batch_size
+        for start in range(0, len(ids), step):
+            operation(
+                ids=ids[start:start + step],
+                **{name: values[start:start + step] for name, values in columns.items()},
+            )
 
     def _split_into_chunks(
         self,
@@ -137,23 +341,26 @@ class KnowledgeBase:
         Returns:
             List of text chunks
         """
-        # Split by headers first for better semantic boundaries
+        # Split by headers first for better semantic boundaries. Lines and
+        # paragraphs are buffered in lists and joined once per flush
         sections = []
-        current_section = ""
+        section_lines: list[str] = []
         current_header = ""
 
-        for line in content.split("\n"):
+        for line in content.splitlines():
             # Check for markdown headers
             if line.startswith("#"):
-                if current_section.strip():
-                    sections.append((current_header, current_section.strip()))
+                section = "\n".join(section_lines).strip()
+                if section:
+                    sections.append((current_header, section))
                 current_header = line
-                current_section = line + "\n"
+                section_lines = [line]
             else:
-                current_section += line + "\n"
+                section_lines.append(line)
 
-        if current_section.strip():
-            sections.append((current_header, current_section.strip()))
+        section = "\n".join(section_lines).strip()
+        if section:
+            sections.append((current_header, section))
 
         # Now split large sections into smaller chunks
         chunks = []
@@ -161,20 +368,34 @@ class KnowledgeBase:
             if len(section) <= max_chunk_size:
                 chunks.append(section)
             else:
-                # Split by paragraphs
-                paragraphs = section.split("\n\n")
-                current_chunk = ""
-
-                for para in paragraphs:
-                    if len(current_chunk) + len(para) + 2 <= max_chunk_size:
-                        current_chunk += para + "\n\n"
+                # Split by paragraphs; size counts each paragraph plus its separator
+                chunk_parts: list[str] = []
+                chunk_size = 0
+
+                for para in section.split("\n\n"):
+                    if chunk_size + len(para) + 2 <= max_chunk_size:
+                        chunk_parts.append(para)
+                        chunk_size += len(para) + 2
                     else:
-                        if current_chunk.strip():
-                            chunks.append(current_chunk.strip())
-                        current_chunk = para + "\n\n"
-
-                if current_chunk.strip():
-                    chunks.append(current_chunk.strip())
+                        chunk = "\n\n".join(chunk_parts).strip()
+                        chunk_parts = []
+                        chunk_size = 0
+                        if chunk:
+                            chunks.append(chunk)
+                            # Seed the next chunk with the tail of this one,
+                            # starting at a word boundary, if both still fit
+                            tail = chunk[-overlap:] if overlap > 0 else ""
+                            if len(chunk) > overlap:
+                                tail = tail.partition(" ")[2]
+                            if tail and len(tail) + len(para) + 4 <= max_chunk_size:
+                                chunk_parts.append(tail)
+                                chunk_size = len(tail) + 2
+                        chunk_parts.append(para)
+                        chunk_size += len(para) + 2
+
+                chunk = "\n\n".join(chunk_parts).strip()
+                if chunk:
+                    chunks.append(chunk)
 
         return chunks
 
@@ -195,31 +416,65 @@ class KnowledgeBase:
         if not self.collection:
             return []
 
-        try:
-            results = self.collection.query(
-                query_texts=[query],
-                n_results=n_results,
-            )
-
-            # Format results
-            formatted = []
-            for doc, meta, distance in zip(
-                results["documents"][0],
-                results["metadatas"][0],
-                results["distances"][0] if results["distances"] else [0] * len(results["documents"][0]),
-            ):
-                formatted.append({
-                    "document": doc,
-                    "metadata": meta,
-                    "relevance": 1 - distance,  # Convert distance to similarity
-                })
-
-            return formatted
+        # Identical concurrent searches share one embedding + vector DB round trip
+        key = (query, n_results)
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.create_task(self._search(query, n_results))
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
 
+        try:
+            # Shielded so one cancelled caller doesn't cancel the shared search
+            return await asyncio.shield(task)
         except Exception as e:
             logger.error(f"Search error: {e}")
             return []
 
+    def _embed_query(self, query: str) -> np.ndarray:
+        """Embed a query and normalize it to unit length."""
+        embedding = np.asarray(self.embedding_function([query])[0], dtype=np.float32)
+        embedding /= np.linalg.norm(embedding) or 1.0
+        return embedding
+
+    async def _search(self, query: str, n_results: int) -> list[dict[str, Any]]:
+        """Run one search, keeping the blocking model and DB calls off the event loop.
+
+        Args:
+            query: Search query string
+            n_results: Number of results to return
+
+        Returns:
+            List of result dictionaries with 'document' and 'metadata' keys
+        """
+        embedding = await asyncio.to_thread(self._embed_query, query)
+
+        cached = self.search_cache.get(embedding, n_results)
+        if cached is not None:
+            return cached
+
+        results = await asyncio.to_thread(
+            self.collection.query,
+            query_embeddings=[embedding.tolist()],
+            n_results=n_results,
+        )
+
+        # Format results
+        documents = results["documents"][0]
+        metadatas = results["metadatas"][0]
+        distances = results["distances"][0] if results.get("distances") else (0,) * len(documents)
+        formatted = [
+            {
+                "document": doc,
+                "metadata": meta,
+                "relevance": 1 - distance,  # Convert distance to similarity
+            }
+            for doc, meta, distance in zip(documents, metadatas, distances)
+        ]
+
+        self.search_cache.put(embedding, n_results, formatted)
+        return formatted
+
     async def add_document(
         self,
         content: str,
@@ -236,17 +491,22 @@ class KnowledgeBase:
         Returns:
             Document ID
         """
-        doc_id = hashlib.md5(f"{source}:{content[:100]}".encode()).hexdigest()
+        doc_id = hashlib.md5(f"{source}:{content[:100]}".encode(), usedforsecurity=False).hexdigest()
 
         meta = {"source": source}
         if metadata:
             meta.update(metadata)
 
-        self.collection.add(
+        # Embedding the document is CPU-bound, so keep it off the event loop
+        await asyncio.to_thread(
+            self.collection.add,
             documents=[content],
             metadatas=[meta],
             ids=[doc_id],
         )
+        # New content can change any query's results
+        self.search_cache.clear()
+        self._document_count = None
 
         return doc_id
 
@@ -259,8 +519,13 @@ class KnowledgeBase:
         if not self.collection:
             return {"status": "not initialized"}
 
+        # Only this instance writes to the collection, so the count stays
+        # valid until it adds documents; polling skips the Chroma round trip
+        if self._document_count is None:
+            self._document_count = self.collection.count()
+
         return {
             "status": "ready",
-            "document_count": self.collection.count(),
+            "document_count": self._document_count,
             "collection_name": "unifi_knowledge",
         }
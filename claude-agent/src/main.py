@@ -9,6 +9,7 @@ import uvicorn
 from fastapi import FastAPI
 
 from .agent.core import UniFiExpertAgent
+from .agent.tools import close_api_clients, warm_api_clients
 from .api.routes import router
 from .config import settings
 from .knowledge.embeddings import KnowledgeBase
@@ -44,6 +45,13 @@ async def lifespan(app: FastAPI):
     app.state.agent = agent
     logger.info("Agent initialized")
 
+    if settings.PROMPT_CACHE_HEARTBEAT:
+        await agent.start_cache_heartbeat()
+        logger.info("Prompt cache heartbeat enabled")
+
+    # Open UniFi controller connections in the background
+    warmup_task = asyncio.create_task(warm_api_clients())
+
     # Start Slack handler in background
     slack_task = None
     if settings.SLACK_APP_TOKEN and settings.SLACK_BOT_TOKEN:
@@ -64,6 +72,13 @@ async def lifespan(app: FastAPI):
         except asyncio.CancelledError:
             pass
 
+    warmup_task.cancel()
+    try:
+        await warmup_task
+    except asyncio.CancelledError:
+        pass
+
+    await close_api_clients()
     await agent.close()
     logger.info("Shutdown complete")
 
@@ -104,6 +119,9 @@ def main():
         "src.main:app",
         host=settings.API_HOST,
         port=settings.API_PORT,
+        # Both ship with uvicorn[standard]; pinned so a missing one fails loudly
+        loop="uvloop",
+        http="httptools",
         reload=False,
         log_level=settings.LOG_LEVEL.lower(),
     )
@@ -1,52 +1,165 @@
 """Slack Socket Mode handler for the UniFi Expert Agent."""
 
+import asyncio
+import contextlib
 import logging
 import re
+import time
+from functools import lru_cache
 
+import aiohttp
 from slack_bolt.adapter.socket_mode.async_handler import AsyncSocketModeHandler
 from slack_bolt.async_app import AsyncApp
+from slack_sdk.errors import SlackApiError
 
 from ..agent.confirmations import ConfirmationStore, DuoAuthClient, PendingAction
-from ..agent.tools import TOOL_DEFINITIONS, ConfirmationRequired, set_confirmation_store
+from ..agent.tools import TOOL_BY_NAME, ConfirmationRequired, set_confirmation_store
 from ..config import settings
 
 logger = logging.getLogger(__name__)
 
-# Global confirmation store
-_confirmation_store: ConfirmationStore | None = None
+# Minimum seconds between streamed message edits (Slack rate-limits chat.update)
+STREAM_UPDATE_INTERVAL = 1.0
 
+# Seconds an approved action may take before a "Confirming..." notice is shown
+PROCESSING_NOTICE_DELAY = 0.4
 
-def get_confirmation_store() -> ConfirmationStore:
-    """Get the global confirmation store, creating it if needed."""
-    global _confirmation_store
-    if _confirmation_store is None:
-        # Check if Duo is configured
-        duo_client = None
-        if all([
-            settings.DUO_INTEGRATION_KEY,
-            settings.DUO_SECRET_KEY,
-            settings.DUO_API_HOST,
-            settings.DUO_MFA_USER,
-        ]):
-            duo_client = DuoAuthClient(
-                integration_key=settings.DUO_INTEGRATION_KEY,
-                secret_key=settings.DUO_SECRET_KEY,
-                api_host=settings.DUO_API_HOST,
-                mfa_user=settings.DUO_MFA_USER,
-            )
-            logger.info(f"Duo MFA enabled for user {settings.DUO_MFA_USER}")
-        else:
-            logger.info("Duo MFA not configured - dangerous actions will use Slack-only confirmation")
+# Slack user mentions, e.g. <@U123ABC> or <@U123ABC|name>
+_MENTION_RE = re.compile(r"<@[A-Z0-9]+(?:\|[^>]+)?>")
 
-        _confirmation_store = ConfirmationStore(
-            ttl_minutes=5,
-            duo_client=duo_client,
-        )
+# App Home tab; static, so built once and published as-is
+_HOME_VIEW = {
+    "type": "home",
+    "blocks": [
+        {
+            "type": "header",
+            "text": {
+                "type": "plain_text",
+                "text": ":satellite: UniFi Network Expert",
+            },
+        },
+        {
+            "type": "section",
+            "text": {
+                "type": "mrkdwn",
+                "text": "I'm your AI-powered UniFi network assistant. I can help you with:",
+            },
+        },
+        {
+            "type": "section",
+            "text": {
+                "type": "mrkdwn",
+                "text": (
+                    "*Network Status*\n"
+                    "Check device health, connectivity, and performance\n\n"
+                    "*Security Audits*\n"
+                    "Review WiFi security, VLANs, and firewall rules\n\n"
+                    "*Troubleshooting*\n"
+                    "Diagnose connectivity issues and get remediation steps\n\n"
+                    "*Best Practices*\n"
+                    "Get recommendations for optimal network configuration\n\n"
+                    "*Administrative Actions* :new:\n"
+                    "Restart devices, block clients, manage guest access"
+                ),
+            },
+        },
+        {"type": "divider"},
+        {
+            "type": "section",
+            "text": {
+                "type": "mrkdwn",
+                "text": (
+                    "*How to Use*\n"
+                    "- Send me a direct message\n"
+                    "- @mention me in a channel\n"
+                    "- Ask natural language questions about your network"
+                ),
+            },
+        },
+        {
+            "type": "section",
+            "text": {
+                "type": "mrkdwn",
+                "text": (
+                    "*Example Questions*\n"
+                    "- _What's the status of my network?_\n"
+                    "- _Are there any devices offline?_\n"
+                    "- _Show me connected clients_\n"
+                    "- _Who are the top bandwidth users?_\n"
+                    "- _What's the recommended channel for 5GHz?_\n\n"
+                    "*Admin Commands*\n"
+                    "- _Restart the living room AP_\n"
+                    "- _Block the device with MAC xx:xx:xx_\n"
+                    "- _Disable the Guest WiFi network_"
+                ),
+            },
+        },
+    ],
+}
 
-        # Set the store in tools module so tools can validate tokens
-        set_confirmation_store(_confirmation_store)
 
-    return _confirmation_store
+async def _is_user_dm(event: dict) -> bool:
+    """Match direct messages from people that contain text.
+
+    Subtyped messages (edits, joins, bot posts) never get here: the listener's
+    ``"subtype": None`` constraint drops them before matchers run.
+    """
+    if event.get("channel_type") != "im" or event.get("bot_id"):
+        return False
+    text = event.get("text")
+    return bool(text) and not text.isspace()
+
+
+@lru_cache
+def get_confirmation_store() -> ConfirmationStore:
+    """Get the global confirmation store, creating it (and its Duo client) once."""
+    # Check if Duo is configured
+    duo_client = None
+    if all([
+        settings.DUO_INTEGRATION_KEY,
+        settings.DUO_SECRET_KEY,
+        settings.DUO_API_HOST,
+        settings.DUO_MFA_USER,
+    ]):
+        duo_client = DuoAuthClient(
+            integration_key=settings.DUO_INTEGRATION_KEY,
+            secret_key=settings.DUO_SECRET_KEY,
+            api_host=settings.DUO_API_HOST,
+            mfa_user=settings.DUO_MFA_USER,
+            pool_size=settings.DUO_POOL_SIZE,
+        )
+        logger.info(f"Duo MFA enabled for user {settings.DUO_MFA_USER}")
+    else:
+        logger.info("Duo MFA not configured - dangerous actions will use Slack-only confirmation")
+
+    store = ConfirmationStore(
+        ttl_minutes=5,
+        duo_client=duo_client,
+    )
+
+    # Set the store in tools module so tools can validate tokens
+    set_confirmation_store(store)
+
+    return store
+
+
+# Static confirmation message fragments, shared by every message (never mutated)
+_RISK_EMOJI = {
+    "moderate": ":warning:",
+    "dangerous": ":rotating_light:",
+    "critical": ":skull:",
+}
+_APPROVE_TEXT = {"type": "plain_text", "text": "Approve"}
+_DENY_TEXT = {"type": "plain_text", "text": "Deny"}
+_EXPIRY_CONTEXT_BLOCK = {
+    "type": "context",
+    "elements": [
+        {
+            "type": "mrkdwn",
+            "text": "_Expires in 5 minutes_",
+        }
+    ],
+}
 
 
 def build_confirmation_message(pending: PendingAction) -> list[dict]:
@@ -58,13 +171,7 @@ def build_confirmation_message(pending: PendingAction) -> list[dict]:
     Returns:
         List of Slack blocks
     """
-    # Risk level styling
-    risk_emoji = {
-        "moderate": ":warning:",
-        "dangerous": ":rotating_light:",
-        "critical": ":skull:",
-    }
-    emoji = risk_emoji.get(pending.risk_level, ":question:")
+    emoji = _RISK_EMOJI.get(pending.risk_level, ":question:")
 
     # Check if Duo is required
     store = get_confirmation_store()
@@ -91,28 +198,20 @@ def build_confirmation_message(pending: PendingAction) -> list[dict]:
             "elements": [
                 {
                     "type": "button",
-                    "text": {"type": "plain_text", "text": "Approve"},
+                    "text": _APPROVE_TEXT,
                     "style": "danger",
                     "action_id": f"approve_{pending.action_id}",
                     "value": pending.action_id,
                 },
                 {
                     "type": "button",
-                    "text": {"type": "plain_text", "text": "Deny"},
+                    "text": _DENY_TEXT,
                     "action_id": f"deny_{pending.action_id}",
                     "value": pending.action_id,
                 },
             ],
         },
-        {
-            "type": "context",
-            "elements": [
-                {
-                    "type": "mrkdwn",
-                    "text": "_Expires in 5 minutes_",
-                }
-            ],
-        },
+        _EXPIRY_CONTEXT_BLOCK,
     ]
 
     return blocks
@@ -128,11 +227,100 @@ async def execute_tool_by_name(tool_name: str, tool_args: dict) -> str:
     Returns:
         Tool result string
     """
-    for tool_def in TOOL_DEFINITIONS:
-        if tool_def["name"] == tool_name:
-            func = tool_def["function"]
-            return await func(**tool_args)
-    return f"Unknown tool: {tool_name}"
+    tool_def = TOOL_BY_NAME.get(tool_name)
+    if tool_def is None:
+        return f"Unknown tool: {tool_name}"
+    return await tool_def["function"](**tool_args)
+
+
+async def _update_or_say(
+    client,
+    say,
+    channel: str,
+    ts: str,
+    text: str,
+    thread_ts: str | None = None,
+) -> None:
+    """Replace a message's text, posting it as a new message if Slack refuses the edit.
+
+    Args:
+        client: Slack client
+        say: Slack say function for the fallback post
+        channel: Channel ID of the message
+        ts: Timestamp of the message to update
+        text: New message text
+        thread_ts: Thread to post the fallback message in
+    """
+    try:
+        await client.chat_update(channel=channel, ts=ts, text=text)
+    except SlackApiError as e:
+        logger.warning(f"chat_update failed ({e.response.get('error')}), posting instead")
+        await say(text=text, thread_ts=thread_ts)
+
+
+class StreamUpdater:
+    """Mirror streamed agent text into a Slack message without stalling the stream.
+
+    Edits go out from a background task at most once per
+    STREAM_UPDATE_INTERVAL; text arriving while an edit is pending is
+    coalesced into the next one. Use as an async context manager around the
+    agent call so no partial edit can land after the final response.
+    """
+
+    def __init__(self, client, channel: str, ts: str):
+        """Initialize the updater.
+
+        Args:
+            client: Slack client
+            channel: Channel ID of the message to update
+            ts: Timestamp of the message to update
+        """
+        self.client = client
+        self.channel = channel
+        self.ts = ts
+        self._latest: str | None = None
+        self._last_update = 0.0
+        self._sending = False
+        self._task: asyncio.Task | None = None
+
+    async def __aenter__(self) -> "StreamUpdater":
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.close()
+
+    async def __call__(self, text: str) -> None:
+        """Record the response text so far and schedule an edit."""
+        self._latest = text
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def _run(self) -> None:
+        """Send the latest text until nothing new is pending."""
+        while self._latest is not None:
+            delay = self._last_update + STREAM_UPDATE_INTERVAL - time.monotonic()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            text, self._latest = self._latest, None
+            self._last_update = time.monotonic()
+            self._sending = True
+            try:
+                await self.client.chat_update(channel=self.channel, ts=self.ts, text=text)
+            except Exception as e:
+                # The final response still replaces the message
+                logger.debug(f"Streaming update failed: {e}")
+            finally:
+                self._sending = False
+
+    async def close(self) -> None:
+        """Drop pending text and wait out any edit already sent."""
+        self._latest = None
+        if self._task is None:
+            return
+        if not self._sending:
+            self._task.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await self._task
 
 
 def create_slack_app(agent) -> AsyncSocketModeHandler:
@@ -145,9 +333,17 @@ def create_slack_app(agent) -> AsyncSocketModeHandler:
         AsyncSocketModeHandler ready to start
     """
     app = AsyncApp(token=settings.SLACK_BOT_TOKEN)
+    # One pooled session for every Web API call; without it slack_sdk opens
+    # a fresh session (and TLS connection) per request
+    app.client.session = aiohttp.ClientSession(
+        connector=aiohttp.TCPConnector(limit=100, ttl_dns_cache=300, keepalive_timeout=60),
+        timeout=aiohttp.ClientTimeout(total=30),
+    )
 
     # Initialize confirmation store
     store = get_confirmation_store()
+    # Action IDs whose Approve click is still being handled
+    approvals_in_progress: set[str] = set()
 
     async def process_agent_response(
         response: str | ConfirmationRequired,
@@ -208,28 +404,22 @@ def create_slack_app(agent) -> AsyncSocketModeHandler:
         else:
             # Regular text response
             if initial_ts:
-                try:
-                    await client.chat_update(
-                        channel=channel,
-                        ts=initial_ts,
-                        text=response,
-                    )
-                except Exception:
-                    await say(text=response, thread_ts=thread_ts)
+                await _update_or_say(client, say, channel, initial_ts, response, thread_ts)
             else:
                 await say(text=response, thread_ts=thread_ts)
 
     @app.event("app_mention")
     async def handle_mention(event: dict, say, client) -> None:
         """Handle @mentions of the bot in channels."""
+        # Slack always sends text, channel and ts on app_mention
         user = event.get("user", "unknown")
-        text = event.get("text", "")
-        channel = event.get("channel", "")
-        thread_ts = event.get("thread_ts") or event.get("ts")
+        text = event["text"]
+        channel = event["channel"]
+        thread_ts = event.get("thread_ts") or event["ts"]
 
         # Remove bot mention from the message
         # Pattern: <@BOTID> or <@BOTID|botname>
-        query = re.sub(r"<@[A-Z0-9]+(\|[^>]+)?>", "", text).strip()
+        query = _MENTION_RE.sub("", text).strip()
 
         if not query:
             await say(
@@ -248,7 +438,8 @@ def create_slack_app(agent) -> AsyncSocketModeHandler:
 
         try:
             # Query the agent
-            response = await agent.query(query)
+            async with StreamUpdater(client, channel, initial_msg["ts"]) as on_text:
+                response = await agent.query(query, on_text=on_text)
 
             # Process response (may be text or ConfirmationRequired)
             await process_agent_response(
@@ -264,33 +455,15 @@ def create_slack_app(agent) -> AsyncSocketModeHandler:
         except Exception as e:
             logger.error(f"Agent error: {e}")
             error_msg = f":x: Sorry, I encountered an error: {str(e)}"
-            try:
-                await client.chat_update(
-                    channel=channel,
-                    ts=initial_msg["ts"],
-                    text=error_msg,
-                )
-            except Exception:
-                await say(text=error_msg, thread_ts=thread_ts)
+            await _update_or_say(client, say, channel, initial_msg["ts"], error_msg, thread_ts)
 
-    @app.event("message")
+    # Filtered by bolt: plain (no subtype) messages, then _is_user_dm
+    @app.event({"type": "message", "subtype": None}, matchers=[_is_user_dm])
     async def handle_message(event: dict, say, client) -> None:
         """Handle direct messages to the bot."""
-        # Only respond to DMs
-        channel_type = event.get("channel_type")
-        if channel_type != "im":
-            return
-
-        # Ignore bot messages and message_changed events
-        if event.get("bot_id") or event.get("subtype"):
-            return
-
         user = event.get("user", "unknown")
-        text = event.get("text", "")
-        channel = event.get("channel", "")
-
-        if not text.strip():
-            return
+        text = event["text"]
+        channel = event["channel"]
 
         logger.info(f"DM from {user}: {text}")
 
@@ -298,7 +471,8 @@ def create_slack_app(agent) -> AsyncSocketModeHandler:
         initial_msg = await say(text=":thinking_face: Let me check on that...")
 
         try:
-            response = await agent.query(text)
+            async with StreamUpdater(client, channel, initial_msg["ts"]) as on_text:
+                response = await agent.query(text, on_text=on_text)
 
             # Process response (may be text or ConfirmationRequired)
             await process_agent_response(
@@ -306,7 +480,7 @@ def create_slack_app(agent) -> AsyncSocketModeHandler:
                 say=say,
                 client=client,
                 channel=channel,
-                thread_ts=event.get("ts", ""),
+                thread_ts=event["ts"],
                 user=user,
                 initial_ts=initial_msg["ts"],
             )
@@ -314,14 +488,11 @@ def create_slack_app(agent) -> AsyncSocketModeHandler:
         except Exception as e:
             logger.error(f"Agent error in DM: {e}")
             error_msg = f":x: Sorry, I encountered an error: {str(e)}"
-            try:
-                await client.chat_update(
-                    channel=channel,
-                    ts=initial_msg["ts"],
-                    text=error_msg,
-                )
-            except Exception:
-                await say(text=error_msg)
+            await _update_or_say(client, say, channel, initial_msg["ts"], error_msg)
+
+    @app.event("message")
+    async def ignore_other_messages() -> None:
+        """Swallow channel messages and edits so bolt doesn't log them as unhandled."""
 
     # =========================================================================
     # Interactive Button Handlers
@@ -340,6 +511,12 @@ def create_slack_app(agent) -> AsyncSocketModeHandler:
 
         logger.info(f"Approve action {action_id} by user {user_id}")
 
+        # The buttons stay live until the final edit, so a second click can
+        # land while the first is running; that handler owns the message
+        if action_id in approvals_in_progress:
+            logger.info(f"Action {action_id} is already being confirmed")
+            return
+
         # Get the pending action
         pending = store.get(action_id)
         if not pending:
@@ -351,49 +528,52 @@ def create_slack_app(agent) -> AsyncSocketModeHandler:
             )
             return
 
-        # Show processing message
-        await client.chat_update(
-            channel=channel,
-            ts=message_ts,
-            text=f":hourglass: Confirming: {pending.description}...",
-            blocks=[],
-        )
-
-        # Confirm and get token (this may trigger Duo MFA)
-        token, error = await store.confirm(action_id, user_id)
-
-        if error:
-            await client.chat_update(
-                channel=channel,
-                ts=message_ts,
-                text=f":x: {error}",
-                blocks=[],
-            )
-            return
+        async def confirm_and_execute() -> str:
+            """Confirm the action and run its tool, returning the final message."""
+            # Confirm and get token (this may trigger Duo MFA)
+            token, error = await store.confirm(action_id, user_id)
+            if error:
+                return f":x: {error}"
 
-        # Execute the tool with the confirmation token
+            # Execute the tool with the confirmation token
+            try:
+                result = await execute_tool_by_name(
+                    pending.tool_name,
+                    {**pending.tool_args, "confirm_token": token},
+                )
+                return f":white_check_mark: *Completed:* {pending.description}\n\n{result}"
+            except Exception as e:
+                logger.error(f"Tool execution error: {e}")
+                return f":x: Error executing action: {str(e)}"
+
+        # No await since the check above, so only one click gets this far;
+        # held until the final edit
+        approvals_in_progress.add(action_id)
         try:
-            result = await execute_tool_by_name(
-                pending.tool_name,
-                {**pending.tool_args, "confirm_token": token},
-            )
-
-            # Show success result
-            await client.chat_update(
-                channel=channel,
-                ts=message_ts,
-                text=f":white_check_mark: *Completed:* {pending.description}\n\n{result}",
-                blocks=[],
-            )
+            # Fast actions go straight to the result; only show a processing
+            # message if this is still running after PROCESSING_NOTICE_DELAY
+            task = asyncio.create_task(confirm_and_execute())
+            done, _ = await asyncio.wait({task}, timeout=PROCESSING_NOTICE_DELAY)
+            if not done:
+                try:
+                    await client.chat_update(
+                        channel=channel,
+                        ts=message_ts,
+                        text=f":hourglass: Confirming: {pending.description}...",
+                        blocks=[],
+                    )
+                except Exception as e:
+                    # The action is already running; still report its outcome
+                    logger.error(f"Failed to show processing message: {e}")
 
-        except Exception as e:
-            logger.error(f"Tool execution error: {e}")
             await client.chat_update(
                 channel=channel,
                 ts=message_ts,
-                text=f":x: Error executing action: {str(e)}",
+                text=await task,
                 blocks=[],
             )
+        finally:
+            approvals_in_progress.discard(action_id)
 
     @app.action(re.compile(r"deny_.*"))
     async def handle_deny(ack, body, client) -> None:
@@ -407,12 +587,14 @@ def create_slack_app(agent) -> AsyncSocketModeHandler:
 
         logger.info(f"Deny action {action_id} by user {user_id}")
 
-        # Get action details before denying
-        pending = store.get(action_id)
-        description = pending.description if pending else "Unknown action"
+        # Too late to cancel: the approval is already running
+        if action_id in approvals_in_progress:
+            logger.info(f"Action {action_id} is already being confirmed, ignoring deny")
+            return
 
-        # Deny the action
-        store.deny(action_id)
+        # Deny the action, keeping its details for the reply
+        pending = store.deny(action_id)
+        description = pending.description if pending else "Unknown action"
 
         await client.chat_update(
             channel=channel,
@@ -426,78 +608,8 @@ def create_slack_app(agent) -> AsyncSocketModeHandler:
         """Update App Home when user opens it."""
         user = event.get("user")
 
-        # Build home view
-        view = {
-            "type": "home",
-            "blocks": [
-                {
-                    "type": "header",
-                    "text": {
-                        "type": "plain_text",
-                        "text": ":satellite: UniFi Network Expert",
-                    },
-                },
-                {
-                    "type": "section",
-                    "text": {
-                        "type": "mrkdwn",
-                        "text": "I'm your AI-powered UniFi network assistant. I can help you with:",
-                    },
-                },
-                {
-                    "type": "section",
-                    "text": {
-                        "type": "mrkdwn",
-                        "text": (
-                            "*Network Status*\n"
-                            "Check device health, connectivity, and performance\n\n"
-                            "*Security Audits*\n"
-                            "Review WiFi security, VLANs, and firewall rules\n\n"
-                            "*Troubleshooting*\n"
-                            "Diagnose connectivity issues and get remediation steps\n\n"
-                            "*Best Practices*\n"
-                            "Get recommendations for optimal network configuration\n\n"
-                            "*Administrative Actions* :new:\n"
-                            "Restart devices, block clients, manage guest access"
-                        ),
-                    },
-                },
-                {"type": "divider"},
-                {
-                    "type": "section",
-                    "text": {
-                        "type": "mrkdwn",
-                        "text": (
-                            "*How to Use*\n"
-                            "- Send me a direct message\n"
-                            "- @mention me in a channel\n"
-                            "- Ask natural language questions about your network"
-                        ),
-                    },
-                },
-                {
-                    "type": "section",
-                    "text": {
-                        "type": "mrkdwn",
-                        "text": (
-                            "*Example Questions*\n"
-                            "- _What's the status of my network?_\n"
-                            "- _Are there any devices offline?_\n"
-                            "- _Show me connected clients_\n"
-                            "- _Who are the top bandwidth users?_\n"
-                            "- _What's the recommended channel for 5GHz?_\n\n"
-                            "*Admin Commands*\n"
-                            "- _Restart the living room AP_\n"
-                            "- _Block the device with MAC xx:xx:xx_\n"
-                            "- _Disable the Guest WiFi network_"
-                        ),
-                    },
-                },
-            ],
-        }
-
         try:
-            await client.views_publish(user_id=user, view=view)
+            await client.views_publish(user_id=user, view=_HOME_VIEW)
         except Exception as e:
             logger.error(f"Failed to publish home view: {e}")
 
@@ -528,5 +640,11 @@ async def start_slack_handler(agent) -> None:
         return
 
     handler = create_slack_app(agent)
+    store = get_confirmation_store()
+    await store.start()
     logger.info("Starting Slack Socket Mode handler...")
-    await handler.start_async()
+    try:
+        await handler.start_async()
+    finally:
+        await store.stop()
+        await handler.app.client.session.close()
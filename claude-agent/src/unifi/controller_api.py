@@ -4,16 +4,90 @@ Uses cookie-based session authentication for full access to configuration.
 API Reference: https://ubntwiki.com/products/software/unifi-controller/api
 """
 
+import asyncio
 import logging
+import time
+from dataclasses import dataclass
 from typing import Any
 
 import httpx
+import orjson
 
 logger = logging.getLogger(__name__)
 
+# Methods that need the CSRF token on UniFi OS
+_WRITE_METHODS = frozenset({"POST", "PUT", "DELETE"})
+
+# TTL (seconds) for cached configuration reads, keyed by REST collection.
+# Config changes rarely and writes through this client invalidate it.
+CONFIG_CACHE_TTL: dict[str, float] = {
+    "networkconf": 60.0,
+    "wlanconf": 60.0,
+    "firewallrule": 60.0,
+    "setting": 120.0,
+}
+
+
+def _canonical_mac(mac: str) -> str:
+    """Convert a MAC address to the controller's lower-case, colon-separated form."""
+    return mac.strip().lower().replace("-", ":")
+
+
+@dataclass(slots=True)
+class Client:
+    """A connected client, normalized once from a /stat/sta record."""
+
+    mac: str
+    hostname: str
+    ip: str
+    essid: str
+    network: str
+    signal: int | None
+    rx_bytes: int
+    tx_bytes: int
+    uptime: int | None
+    is_wired: bool
+    is_guest: bool
+    blocked: bool
+    search_key: str
+
+    @classmethod
+    def from_api(cls, data: dict[str, Any]) -> "Client":
+        """Build a Client from a raw controller record, filling defaults.
+
+        Args:
+            data: Client object as returned by the controller
+
+        Returns:
+            Normalized client
+        """
+        hostname = data.get("hostname") or ""
+        mac = data.get("mac") or ""
+        ip = data.get("ip") or ""
+        return cls(
+            mac=mac or "?",
+            hostname=hostname or data.get("name") or "Unknown",
+            ip=ip or "N/A",
+            essid=data.get("essid") or "",
+            network=data.get("network") or "",
+            signal=data.get("signal"),
+            rx_bytes=data.get("rx_bytes") or 0,
+            tx_bytes=data.get("tx_bytes") or 0,
+            uptime=data.get("uptime"),
+            is_wired=data.get("is_wired", False),
+            is_guest=data.get("is_guest", False),
+            blocked=data.get("blocked", False),
+            # Lower-cased hostname, MAC, and IP for a single substring test;
+            # the NUL separator keeps a search term from matching across fields
+            search_key=f"{hostname}\0{mac}\0{ip}".lower(),
+        )
+
 
 class UniFiControllerAPI:
-    """Client for UniFi Local Controller API with cookie authentication."""
+    """Client for UniFi Local Controller API with cookie authentication.
+
+    Use as ``async with`` to close the HTTP client on exit.
+    """
 
     def __init__(
         self,
@@ -40,28 +114,62 @@ class UniFiControllerAPI:
         self._client: httpx.AsyncClient | None = None
         self._authenticated = False
         self._csrf_token: str | None = None
+        # Serializes logins so concurrent requests share one session
+        self._auth_lock = asyncio.Lock()
+        self._auth_generation = 0  # Bumped on every successful login
+        # Config reads: collection -> (expires_at, data), one fetch in flight per key
+        self._config_cache: dict[str, tuple[float, list[dict[str, Any]]]] = {}
+        self._config_locks: dict[str, asyncio.Lock] = {}
 
     async def _get_client(self) -> httpx.AsyncClient:
-        """Get or create HTTP client with cookie jar."""
+        """Get or create HTTP client with cookie jar.
+
+        HTTP/2 lets concurrent requests (e.g. the audit snapshot's parallel
+        fetches) share one TLS connection to UniFi OS.
+        """
         if self._client is None:
             self._client = httpx.AsyncClient(
+                http2=True,
                 headers={"Accept": "application/json"},
                 verify=self.verify_ssl,
-                timeout=30.0,
+                timeout=httpx.Timeout(30.0, connect=5.0),
+                limits=httpx.Limits(
+                    max_connections=50,
+                    max_keepalive_connections=20,
+                    keepalive_expiry=60.0,
+                ),
                 follow_redirects=True,
             )
         return self._client
 
     async def close(self):
-        """Close the HTTP client."""
-        if self._client:
-            await self._client.aclose()
-            self._client = None
+        """Close the HTTP client. Safe to call more than once."""
+        # Detach before awaiting, so no request picks up the closing client
+        client, self._client = self._client, None
+        if client:
             self._authenticated = False
             self._csrf_token = None
+            await client.aclose()
+
+    async def __aenter__(self) -> "UniFiControllerAPI":
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.close()
 
     async def authenticate(self) -> bool:
-        """Authenticate with the controller and store session cookie.
+        """Ensure there is a controller session, logging in if needed.
+
+        Safe to call concurrently with requests: all logins share _auth_lock.
+
+        Returns:
+            True if a session is established
+        """
+        await self._login()
+        return self._authenticated
+
+    async def _do_authenticate(self) -> bool:
+        """Log in to the controller and store session cookie (caller holds _auth_lock).
 
         Returns:
             True if authentication succeeded
@@ -77,6 +185,7 @@ class UniFiControllerAPI:
 
         if response.status_code == 200:
             self._authenticated = True
+            self._auth_generation += 1
             # Capture CSRF token from response headers (required for write operations on UniFi OS)
             self._csrf_token = response.headers.get("x-csrf-token")
             if self._csrf_token:
@@ -88,39 +197,104 @@ class UniFiControllerAPI:
         logger.error(f"Authentication failed: {response.status_code}")
         return False
 
+    async def _login(self, failed_generation: int | None = None) -> None:
+        """Authenticate once on behalf of all concurrent requests.
+
+        Args:
+            failed_generation: Session generation of a request that was
+                rejected; skipped if another request has logged in since.
+                None logs in only if not yet authenticated.
+        """
+        async with self._auth_lock:
+            if failed_generation is None:
+                if self._authenticated:
+                    return
+            elif failed_generation != self._auth_generation:
+                return
+            await self._do_authenticate()
+
+    def _headers_for(
+        self, is_write: bool, headers: dict[str, str] | None
+    ) -> dict[str, str] | None:
+        """Add the CSRF token to a write request's headers (required by UniFi OS).
+
+        Args:
+            is_write: Whether the request is a POST/PUT/DELETE
+            headers: Caller-supplied headers, never modified
+
+        Returns:
+            Headers to send; reads get the caller's headers back unchanged
+        """
+        if not is_write or not self._csrf_token:
+            return headers
+        return {**(headers or {}), "x-csrf-token": self._csrf_token}
+
     async def _request(self, method: str, path: str, **kwargs) -> dict[str, Any]:
         """Make an authenticated API request."""
         if not self._authenticated:
-            await self.authenticate()
+            await self._login()
+        generation = self._auth_generation
 
         client = await self._get_client()
         url = f"{self.base_url}/proxy/network/api/s/{self.site}{path}"
+        is_write = method.upper() in _WRITE_METHODS
+        user_headers = kwargs.pop("headers", None)
+
+        logger.debug(f"API request: {method} {url}")
+        for retry in (False, True):
+            # Headers are rebuilt per attempt so a retry carries the refreshed CSRF token
+            response = await client.request(
+                method, url, headers=self._headers_for(is_write, user_headers), **kwargs
+            )
+            if retry or response.status_code not in (401, 403):
+                break
+            # Re-authenticate if session expired or forbidden (CSRF token may have expired)
+            logger.info(f"Request returned {response.status_code}, re-authenticating")
+            await self._login(failed_generation=generation)
 
-        # Add CSRF token header for write operations (required by UniFi OS)
-        if method.upper() in ("POST", "PUT", "DELETE") and self._csrf_token:
-            headers = kwargs.get("headers", {})
-            headers["x-csrf-token"] = self._csrf_token
-            kwargs["headers"] = headers
-            logger.debug(f"API request: {method} {url} (with CSRF token)")
-        else:
-            logger.debug(f"API request: {method} {url}")
+        response.raise_for_status()
+        # orjson decodes the raw bytes directly; /stat/device runs to hundreds of KB
+        return orjson.loads(response.content)
 
-        response = await client.request(method, url, **kwargs)
+    async def _get_config(self, collection: str) -> list[dict[str, Any]]:
+        """Fetch a /rest configuration collection, cached per CONFIG_CACHE_TTL.
 
-        # Re-authenticate if session expired or forbidden (CSRF token may have expired)
-        if response.status_code in (401, 403):
-            logger.info(f"Request returned {response.status_code}, re-authenticating")
-            self._authenticated = False
-            await self.authenticate()
-            # Re-add CSRF token after re-authentication
-            if method.upper() in ("POST", "PUT", "DELETE") and self._csrf_token:
-                headers = kwargs.get("headers", {})
-                headers["x-csrf-token"] = self._csrf_token
-                kwargs["headers"] = headers
-            response = await client.request(method, url, **kwargs)
+        Concurrent callers on a cold key share a single request.
 
-        response.raise_for_status()
-        return response.json()
+        Args:
+            collection: REST collection name (e.g., "wlanconf")
+
+        Returns:
+            The collection's data list
+        """
+        entry = self._config_cache.get(collection)
+        if entry and entry[0] > time.monotonic():
+            return entry[1]
+
+        lock = self._config_locks.setdefault(collection, asyncio.Lock())
+        async with lock:
+            # Another caller may have refreshed it while we waited
+            entry = self._config_cache.get(collection)
+            if entry and entry[0] > time.monotonic():
+                return entry[1]
+            result = await self._request("GET", f"/rest/{collection}")
+            data = result.get("data", [])
+            self._config_cache[collection] = (
+                time.monotonic() + CONFIG_CACHE_TTL[collection],
+                data,
+            )
+            return data
+
+    def invalidate_config(self, collection: str | None = None) -> None:
+        """Drop cached configuration so the next read hits the controller.
+
+        Args:
+            collection: Collection to drop, or None for all of them
+        """
+        if collection is None:
+            self._config_cache.clear()
+        else:
+            self._config_cache.pop(collection, None)
 
     async def get_networks(self) -> list[dict[str, Any]]:
         """Get network/VLAN configuration.
@@ -128,8 +302,7 @@ class UniFiControllerAPI:
         Returns:
             List of network objects with name, vlan, purpose, etc.
         """
-        result = await self._request("GET", "/rest/networkconf")
-        return result.get("data", [])
+        return await self._get_config("networkconf")
 
     async def get_wlans(self) -> list[dict[str, Any]]:
         """Get wireless network (SSID) configuration.
@@ -137,8 +310,7 @@ class UniFiControllerAPI:
         Returns:
             List of WLAN objects with name, security, wpa_mode, pmf_mode, etc.
         """
-        result = await self._request("GET", "/rest/wlanconf")
-        return result.get("data", [])
+        return await self._get_config("wlanconf")
 
     async def get_firewall_rules(self) -> list[dict[str, Any]]:
         """Get firewall rules.
@@ -146,8 +318,7 @@ class UniFiControllerAPI:
         Returns:
             List of firewall rule objects with name, action, etc.
         """
-        result = await self._request("GET", "/rest/firewallrule")
-        return result.get("data", [])
+        return await self._get_config("firewallrule")
 
     async def get_devices(self) -> list[dict[str, Any]]:
         """Get detailed device statistics.
@@ -168,7 +339,7 @@ class UniFiControllerAPI:
             Device object or None if not found
         """
         devices = await self.get_devices()
-        mac_normalized = mac.lower().replace("-", ":")
+        mac_normalized = _canonical_mac(mac)
         for device in devices:
             if device.get("mac", "").lower() == mac_normalized:
                 return device
@@ -189,23 +360,22 @@ class UniFiControllerAPI:
         Returns:
             List of settings objects.
         """
-        result = await self._request("GET", "/rest/setting")
-        return result.get("data", [])
+        return await self._get_config("setting")
 
     # =========================================================================
     # Additional Read Methods (Phase 1)
     # =========================================================================
 
-    async def get_clients(self) -> list[dict[str, Any]]:
+    async def get_clients(self) -> list[Client]:
         """Get all connected clients.
 
         Returns:
-            List of client objects with MAC, IP, hostname, signal, traffic, etc.
+            List of normalized clients with MAC, IP, hostname, signal, traffic, etc.
         """
         result = await self._request("GET", "/stat/sta")
-        return result.get("data", [])
+        return [Client.from_api(c) for c in result.get("data", [])]
 
-    async def get_client_by_mac(self, mac: str) -> dict[str, Any] | None:
+    async def get_client_by_mac(self, mac: str) -> Client | None:
         """Get a specific client by MAC address.
 
         Args:
@@ -215,9 +385,9 @@ class UniFiControllerAPI:
             Client object or None if not found
         """
         clients = await self.get_clients()
-        mac_normalized = mac.lower().replace("-", ":")
+        mac_normalized = _canonical_mac(mac)
         for client in clients:
-            if client.get("mac", "").lower() == mac_normalized:
+            if client.mac.lower() == mac_normalized:
                 return client
         return None
 
@@ -230,7 +400,6 @@ class UniFiControllerAPI:
         Returns:
             List of event objects
         """
-        import time
         start = int((time.time() - hours * 3600) * 1000)
         result = await self._request("GET", f"/stat/event?start={start}")
         return result.get("data", [])
@@ -292,7 +461,7 @@ class UniFiControllerAPI:
         result = await self._request(
             "POST",
             "/cmd/devmgr",
-            json={"mac": mac, "cmd": cmd}
+            json={"mac": _canonical_mac(mac), "cmd": cmd}
         )
         return result
 
@@ -312,7 +481,7 @@ class UniFiControllerAPI:
         result = await self._request(
             "POST",
             "/cmd/stamgr",
-            json={"mac": mac, "cmd": f"{cmd}-sta"}
+            json={"mac": _canonical_mac(mac), "cmd": f"{cmd}-sta"}
         )
         return result
 
@@ -337,7 +506,7 @@ class UniFiControllerAPI:
             API response dict
         """
         payload: dict[str, Any] = {
-            "mac": mac,
+            "mac": _canonical_mac(mac),
             "cmd": "authorize-guest",
             "minutes": minutes
         }
@@ -361,12 +530,15 @@ class UniFiControllerAPI:
         Returns:
             API response dict
         """
-        result = await self._request(
-            "PUT",
-            f"/rest/wlanconf/{wlan_id}",
-            json=updates
-        )
-        return result
+        try:
+            return await self._request(
+                "PUT",
+                f"/rest/wlanconf/{wlan_id}",
+                json=updates
+            )
+        finally:
+            # Also after a failed write, so a retry re-reads the current list
+            self.invalidate_config("wlanconf")
 
     async def get_wlan_by_name(self, name: str) -> dict[str, Any] | None:
         """Find a WLAN by its name.
@@ -378,8 +550,9 @@ class UniFiControllerAPI:
             WLAN object or None if not found
         """
         wlans = await self.get_wlans()
+        name_lower = name.lower()
         for wlan in wlans:
-            if wlan.get("name", "").lower() == name.lower():
+            if wlan.get("name", "").lower() == name_lower:
                 return wlan
         return None
 
@@ -393,12 +566,15 @@ class UniFiControllerAPI:
         Returns:
             API response dict
         """
-        result = await self._request(
-            "PUT",
-            f"/rest/firewallrule/{rule_id}",
-            json=updates
-        )
-        return result
+        try:
+            return await self._request(
+                "PUT",
+                f"/rest/firewallrule/{rule_id}",
+                json=updates
+            )
+        finally:
+            # Also after a failed write, so a retry re-reads the current list
+            self.invalidate_config("firewallrule")
 
     async def get_firewall_rule_by_name(self, name: str) -> dict[str, Any] | None:
         """Find a firewall rule by its name.
@@ -410,7 +586,8 @@ class UniFiControllerAPI:
             Rule object or None if not found
         """
         rules = await self.get_firewall_rules()
+        name_lower = name.lower()
         for rule in rules:
-            if rule.get("name", "").lower() == name.lower():
+            if rule.get("name", "").lower() == name_lower:
                 return rule
         return None
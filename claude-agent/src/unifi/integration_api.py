@@ -4,16 +4,25 @@ Uses X-API-KEY header authentication for read-only access to sites and devices.
 API Reference: https://developer.ui.com/site-manager-api/gettingstarted
 """
 
+import asyncio
 import logging
+import time
 from typing import Any
 
 import httpx
+import orjson
 
 logger = logging.getLogger(__name__)
 
+# Seconds the site list is cached; sites are effectively static
+SITES_CACHE_TTL = 300.0
+
 
 class UniFiIntegrationAPI:
-    """Client for UniFi Network Integration API."""
+    """Client for UniFi Network Integration API.
+
+    Use as ``async with`` to close the HTTP client on exit.
+    """
 
     def __init__(self, base_url: str, api_token: str, verify_ssl: bool = False):
         """Initialize the API client.
@@ -27,25 +36,45 @@ class UniFiIntegrationAPI:
         self.api_token = api_token
         self.verify_ssl = verify_ssl
         self._client: httpx.AsyncClient | None = None
+        # Site list: (expires_at, sites), one fetch in flight
+        self._sites_cache: tuple[float, list[dict[str, Any]]] | None = None
+        self._sites_lock = asyncio.Lock()
 
     async def _get_client(self) -> httpx.AsyncClient:
-        """Get or create HTTP client."""
+        """Get or create HTTP client.
+
+        HTTP/2 is negotiated via ALPN (falling back to HTTP/1.1), so
+        concurrent requests share one kept-alive TLS connection.
+        """
         if self._client is None:
             self._client = httpx.AsyncClient(
+                http2=True,
                 headers={
                     "X-API-KEY": self.api_token,
                     "Accept": "application/json",
                 },
                 verify=self.verify_ssl,
-                timeout=30.0,
+                timeout=httpx.Timeout(30.0, connect=5.0),
+                limits=httpx.Limits(
+                    max_connections=50,
+                    max_keepalive_connections=20,
+                    keepalive_expiry=60.0,
+                ),
             )
         return self._client
 
     async def close(self):
-        """Close the HTTP client."""
-        if self._client:
-            await self._client.aclose()
-            self._client = None
+        """Close the HTTP client. Safe to call more than once."""
+        # Detach before awaiting, so no request picks up the closing client
+        client, self._client = self._client, None
+        if client:
+            await client.aclose()
+
+    async def __aenter__(self) -> "UniFiIntegrationAPI":
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.close()
 
     async def _request(self, method: str, path: str, **kwargs) -> dict[str, Any]:
         """Make an API request."""
@@ -56,16 +85,27 @@ class UniFiIntegrationAPI:
         response = await client.request(method, url, **kwargs)
         response.raise_for_status()
 
-        return response.json()
+        return orjson.loads(response.content)
 
     async def get_sites(self) -> list[dict[str, Any]]:
-        """Get all UniFi sites.
+        """Get all UniFi sites, cached for SITES_CACHE_TTL.
 
         Returns:
             List of site objects with id, internalReference, name, etc.
         """
-        result = await self._request("GET", "/sites")
-        return result.get("data", [])
+        entry = self._sites_cache
+        if entry and entry[0] > time.monotonic():
+            return entry[1]
+
+        async with self._sites_lock:
+            # Another caller may have refreshed it while we waited
+            entry = self._sites_cache
+            if entry and entry[0] > time.monotonic():
+                return entry[1]
+            result = await self._request("GET", "/sites")
+            sites = result.get("data", [])
+            self._sites_cache = (time.monotonic() + SITES_CACHE_TTL, sites)
+            return sites
 
     async def get_devices(self, site_id: str) -> list[dict[str, Any]]:
         """Get all devices for a site.
@@ -3,16 +3,13 @@
 import os
 from unittest.mock import patch
 
-import pytest
+from src.config import Settings
 
 
 def test_settings_defaults():
     """Test that settings have sensible defaults."""
-    # Import inside test to avoid side effects
     with patch.dict(os.environ, {}, clear=True):
-        from src.config import Settings
-
-        settings = Settings()
+        settings = Settings(_env_file=None)
 
         assert settings.UNIFI_SITE == "default"
         assert settings.CHROMADB_HOST == "chromadb"
@@ -31,12 +28,10 @@ def test_settings_from_env():
         "UNIFI_SITE": "home",
     }
 
+    # A fresh Settings reads the patched environment; reloading src.config
+    # would also replace the module-level settings other modules hold
     with patch.dict(os.environ, env, clear=True):
-        from importlib import reload
-        import src.config
-        reload(src.config)
-
-        settings = src.config.Settings()
+        settings = Settings(_env_file=None)
 
         assert settings.ANTHROPIC_API_KEY == "test-key"
         assert settings.SLACK_BOT_TOKEN == "xoxb-test"
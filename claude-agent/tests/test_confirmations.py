@@ -0,0 +1,171 @@
+"""Tests for the confirmation store."""
+
+import asyncio
+
+from src.agent.confirmations import ConfirmationStore
+
+
+class StubDuoClient:
+    """Duo client whose pushes stay pending until released."""
+
+    def __init__(self):
+        self.pushes = 0
+        self.release = asyncio.Event()
+
+    async def send_push(self, description: str, action_id: str) -> tuple[bool, str]:
+        self.pushes += 1
+        await self.release.wait()
+        return True, f"tx{self.pushes}"
+
+
+def create_action(
+    store: ConfirmationStore,
+    tool_name: str = "device_admin_command",
+    risk_level: str = "moderate",
+):
+    """Create a pending action with fixed test values."""
+    return store.create(
+        tool_name=tool_name,
+        tool_args={"mac_address": "00:11:22:33:44:55", "command": "restart"},
+        user_id="U123",
+        channel_id="C123",
+        thread_ts="1.0",
+        message_ts="1.1",
+        risk_level=risk_level,
+        description="Restart device 00:11:22:33:44:55",
+        impact="Device will reboot.",
+    )
+
+
+async def test_confirm_and_validate_token():
+    """Test that a confirmed token validates once for the right tool."""
+    store = ConfirmationStore()
+    action = create_action(store)
+
+    token, error = await store.confirm(action.action_id, "U123")
+    assert error is None
+    assert token
+
+    assert store.validate_token("client_admin_command", token) is None
+    assert store.validate_token("device_admin_command", token) == {
+        "mac_address": "00:11:22:33:44:55",
+        "command": "restart",
+    }
+    # Tokens are single-use
+    assert store.validate_token("device_admin_command", token) is None
+    assert store.get(action.action_id) is None
+
+
+async def test_confirm_requires_original_user():
+    """Test that only the requester can confirm an action."""
+    store = ConfirmationStore()
+    action = create_action(store)
+
+    token, error = await store.confirm(action.action_id, "U999")
+    assert token is None
+    assert error == "Only the original requester can confirm this action."
+
+
+async def test_deny_during_duo_push_issues_no_token():
+    """Test that an action removed while its Duo push is pending isn't confirmed."""
+    duo = StubDuoClient()
+    store = ConfirmationStore(duo_client=duo)
+    action = create_action(store, risk_level="dangerous")
+
+    confirming = asyncio.create_task(store.confirm(action.action_id, "U123"))
+    await asyncio.sleep(0)
+    assert store.pop(action.action_id) is action
+    duo.release.set()
+
+    token, error = await confirming
+    assert token is None
+    assert error == "Action expired or was already handled."
+    assert store._tokens == {}
+
+
+async def test_concurrent_confirms_issue_one_token():
+    """Test that overlapping confirmations of one action push once and issue one token."""
+    duo = StubDuoClient()
+    store = ConfirmationStore(duo_client=duo)
+    action = create_action(store, risk_level="dangerous")
+
+    first = asyncio.create_task(store.confirm(action.action_id, "U123"))
+    second = asyncio.create_task(store.confirm(action.action_id, "U123"))
+    await asyncio.sleep(0)
+    duo.release.set()
+
+    (token, error), (token2, error2) = await asyncio.gather(first, second)
+    assert token and error is None
+    assert (token2, error2) == (None, "Action is already being confirmed.")
+    assert duo.pushes == 1
+    assert store._tokens == {token: action.action_id}
+
+
+async def test_deny_invalidates_token():
+    """Test that denying an action also invalidates its token."""
+    store = ConfirmationStore()
+    action = create_action(store)
+    token, _ = await store.confirm(action.action_id, "U123")
+
+    assert store.deny(action.action_id) is action
+    assert store.deny(action.action_id) is None
+    assert store.validate_token("device_admin_command", token) is None
+
+
+def test_pop_returns_action_once():
+    """Test that pop removes the action and returns it only the first time."""
+    store = ConfirmationStore()
+    action = create_action(store)
+
+    assert store.pop(action.action_id) is action
+    assert store.pop(action.action_id) is None
+    assert store.get(action.action_id) is None
+
+
+def test_cleanup_expired_removes_only_expired():
+    """Test that cleanup removes expired actions and keeps live ones."""
+    store = ConfirmationStore()
+    expired = create_action(store)
+    expired.expires_at_ns = 0
+    live = create_action(store)
+    denied = create_action(store)
+    store.deny(denied.action_id)
+
+    assert store.cleanup_expired() == 1
+    assert store.get(expired.action_id) is None
+    # An immediate second sweep still runs, and keeps the live action
+    assert store.cleanup_expired() == 0
+    assert store.list_pending() == [live]
+
+
+async def test_expired_token_is_rejected():
+    """Test that a confirmed token stops validating once its action expires."""
+    store = ConfirmationStore()
+    action = create_action(store)
+    token, _ = await store.confirm(action.action_id, "U123")
+
+    action.expires_at_ns = 0
+    assert store.validate_token("device_admin_command", token) is None
+
+
+async def test_validate_token_only_consumes_matching_action():
+    """Test that validating one token leaves other pending actions intact."""
+    store = ConfirmationStore()
+    actions = [create_action(store) for _ in range(50)]
+    target = actions[25]
+    token, _ = await store.confirm(target.action_id, "U123")
+
+    assert store.validate_token("device_admin_command", "not-a-token") is None
+    assert store.validate_token("device_admin_command", token) is not None
+    assert store.get(target.action_id) is None
+    assert len(store.list_pending()) == 49
+
+
+def test_create_evicts_oldest_when_full():
+    """Test that the store never grows past max_size."""
+    store = ConfirmationStore(max_size=3)
+    actions = [create_action(store) for _ in range(4)]
+
+    assert len(store.list_pending()) == 3
+    assert store.get(actions[0].action_id) is None
+    assert store.get(actions[3].action_id) is not None
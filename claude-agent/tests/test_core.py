@@ -0,0 +1,171 @@
+"""Tests for the agent's streamed tool-use loop."""
+
+import asyncio
+import json
+
+import httpx
+import pytest
+
+from src.agent import core
+from src.agent.tools import ConfirmationRequired
+
+
+def sse(*events: dict) -> bytes:
+    """Encode events as a Messages API server-sent event stream."""
+    return "".join(
+        f"event: {event['type']}\ndata: {json.dumps(event)}\n\n" for event in events
+    ).encode()
+
+
+def text_block(index: int, *chunks: str) -> list[dict]:
+    """Build the events for a streamed text block."""
+    return [
+        {"type": "content_block_start", "index": index, "content_block": {"type": "text", "text": ""}},
+        *(
+            {"type": "content_block_delta", "index": index, "delta": {"type": "text_delta", "text": chunk}}
+            for chunk in chunks
+        ),
+        {"type": "content_block_stop", "index": index},
+    ]
+
+
+def tool_block(index: int, name: str, *partial_json: str) -> list[dict]:
+    """Build the events for a streamed tool_use block."""
+    return [
+        {
+            "type": "content_block_start",
+            "index": index,
+            "content_block": {"type": "tool_use", "id": f"toolu_{index}", "name": name, "input": {}},
+        },
+        *(
+            {"type": "content_block_delta", "index": index, "delta": {"type": "input_json_delta", "partial_json": part}}
+            for part in partial_json
+        ),
+        {"type": "content_block_stop", "index": index},
+    ]
+
+
+def stop(reason: str) -> dict:
+    """Build the message_delta event carrying the stop reason."""
+    return {"type": "message_delta", "delta": {"stop_reason": reason}}
+
+
+@pytest.fixture
+async def agent_turns(monkeypatch):
+    """Serve each queued SSE body as one Anthropic turn, recording request bodies."""
+    turns: list[bytes] = []
+    requests: list[dict] = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(json.loads(request.content))
+        return httpx.Response(200, content=turns.pop(0))
+
+    async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+        monkeypatch.setattr(core, "_http_client", client)
+        yield turns, requests
+
+
+@pytest.fixture
+def calls(monkeypatch):
+    """Register fake tools and return the log of their calls."""
+    log: list = []
+
+    async def traffic(hours: int = 24) -> str:
+        log.append(("traffic", hours))
+        return f"traffic for {hours}h"
+
+    async def slow_read() -> str:
+        await asyncio.sleep(0.05)
+        log.append("slow_read done")
+        return "slow"
+
+    async def restart(**kwargs) -> str:
+        log.append(("restart", kwargs))
+        return "restarted"
+
+    async def needs_confirmation(**kwargs) -> ConfirmationRequired:
+        log.append("needs_confirmation")
+        return ConfirmationRequired(
+            tool_name="needs_confirmation",
+            tool_args=kwargs,
+            risk_level="moderate",
+            description="Restart device",
+            impact="Device will reboot.",
+        )
+
+    monkeypatch.setattr(core, "TOOL_BY_NAME", {
+        "traffic": {"function": traffic, "read_only": True},
+        "slow_read": {"function": slow_read, "read_only": True},
+        "restart": {"function": restart},
+        "needs_confirmation": {"function": needs_confirmation},
+    })
+    return log
+
+
+async def test_query_runs_streamed_tools_and_returns_text(agent_turns, calls):
+    """Test that text and tool_use blocks are assembled from the stream."""
+    turns, requests = agent_turns
+    turns.append(sse(
+        *text_block(0, "Let me ", "check."),
+        *tool_block(1, "traffic", '{"hours"', "", ": 2}"),
+        *tool_block(2, "restart", ""),
+        stop("tool_use"),
+    ))
+    turns.append(sse(*text_block(0, "All good."), stop("end_turn")))
+    seen = []
+
+    async def on_text(text: str) -> None:
+        seen.append(text)
+
+    assert await core.UniFiExpertAgent().query("How is traffic?", on_text=on_text) == "All good."
+    assert calls == [("traffic", 2), ("restart", {})]
+    assert seen == ["Let me ", "Let me check.", "All good."]
+
+    assistant, results = requests[1]["messages"][1:]
+    assert assistant["content"][0] == {"type": "text", "text": "Let me check."}
+    assert assistant["content"][1]["input"] == {"hours": 2}
+    assert [r["content"] for r in results["content"]] == ["traffic for 2h", "restarted"]
+
+
+async def test_query_cancels_early_tools_without_tool_use_stop(agent_turns, calls):
+    """Test that a turn which doesn't stop for tool use runs no tools to completion."""
+    turns, _ = agent_turns
+    turns.append(sse(*tool_block(0, "slow_read"), *tool_block(1, "restart", "{}"), stop("max_tokens")))
+
+    result = await core.UniFiExpertAgent().query("hi")
+    await asyncio.sleep(0.1)
+
+    assert result == "I was unable to complete the request after multiple attempts."
+    assert calls == []
+
+
+async def test_query_stops_at_confirmation(agent_turns, calls):
+    """Test that a confirmation request returns at once and cancels pending tools."""
+    turns, _ = agent_turns
+    turns.append(sse(
+        *tool_block(0, "needs_confirmation", '{"mac": "aa"}'),
+        *tool_block(1, "slow_read"),
+        *tool_block(2, "restart", "{}"),
+        stop("tool_use"),
+    ))
+
+    result = await core.UniFiExpertAgent().query("restart it")
+    await asyncio.sleep(0.1)
+
+    assert isinstance(result, ConfirmationRequired)
+    assert result.tool_args == {"mac": "aa"}
+    assert calls == ["needs_confirmation"]
+
+
+async def test_query_raises_on_stream_error(agent_turns, calls):
+    """Test that an error event mid-stream fails the query."""
+    turns, _ = agent_turns
+    turns.append(sse(
+        *tool_block(0, "slow_read"),
+        {"type": "error", "error": {"type": "overloaded_error", "message": "Overloaded"}},
+    ))
+
+    with pytest.raises(RuntimeError, match="Anthropic API error: Overloaded"):
+        await core.UniFiExpertAgent().query("hi")
+    await asyncio.sleep(0.1)
+    assert calls == []
@@ -0,0 +1,94 @@
+"""Tests for the Slack confirmation button handlers."""
+
+import asyncio
+
+import pytest
+
+from src.agent.confirmations import ConfirmationStore
+from src.config import Settings
+from src.slack import handler
+
+
+class FakeSlackClient:
+    """Records chat_update calls."""
+
+    def __init__(self):
+        self.updates: list[str] = []
+
+    async def chat_update(self, **kwargs) -> None:
+        self.updates.append(kwargs["text"])
+
+
+async def ack() -> None:
+    """No-op acknowledgement."""
+
+
+def click(action_id: str, user_id: str = "U123") -> dict:
+    """Build a block action payload for a button click."""
+    return {
+        "actions": [{"value": action_id}],
+        "user": {"id": user_id},
+        "channel": {"id": "C123"},
+        "message": {"ts": "1.1", "thread_ts": "1.0"},
+    }
+
+
+@pytest.fixture
+async def buttons(monkeypatch):
+    """Create the Slack app and return its store and button listeners."""
+    store = ConfirmationStore()
+    monkeypatch.setattr(handler, "settings", Settings(
+        _env_file=None, SLACK_BOT_TOKEN="xoxb-test", SLACK_APP_TOKEN="xapp-test",
+    ))
+    monkeypatch.setattr(handler, "get_confirmation_store", lambda: store)
+    monkeypatch.setattr(handler, "PROCESSING_NOTICE_DELAY", 0.0)
+
+    socket_handler = handler.create_slack_app(agent=None)
+    listeners = {
+        listener.ack_function.__name__: listener.ack_function
+        for listener in socket_handler.app._async_listeners
+    }
+    yield store, listeners["handle_approve"], listeners["handle_deny"]
+    await socket_handler.app.client.session.close()
+    await socket_handler.client.aiohttp_client_session.close()
+
+
+async def test_second_click_leaves_running_approval_alone(buttons, monkeypatch):
+    """Test that Approve/Deny clicks during an approval don't edit the message."""
+    store, handle_approve, handle_deny = buttons
+    release = asyncio.Event()
+    executed = []
+
+    async def execute_tool_by_name(tool_name: str, tool_args: dict) -> str:
+        executed.append(store.validate_token(tool_name, tool_args["confirm_token"]))
+        await release.wait()
+        return "Device restarted."
+
+    monkeypatch.setattr(handler, "execute_tool_by_name", execute_tool_by_name)
+    pending = store.create(
+        tool_name="device_admin_command",
+        tool_args={"mac_address": "00:11:22:33:44:55", "command": "restart"},
+        user_id="U123",
+        channel_id="C123",
+        thread_ts="1.0",
+        message_ts="1.1",
+        risk_level="moderate",
+        description="Restart device",
+        impact="Device will reboot.",
+    )
+    client = FakeSlackClient()
+
+    first = asyncio.create_task(handle_approve(ack, click(pending.action_id), client))
+    while not client.updates:
+        await asyncio.sleep(0)
+    # The token is consumed and the tool is still running
+    await handle_approve(ack, click(pending.action_id), client)
+    await handle_deny(ack, click(pending.action_id), client)
+    release.set()
+    await first
+
+    assert len(executed) == 1 and executed[0] is not None
+    assert client.updates == [
+        ":hourglass: Confirming: Restart device...",
+        ":white_check_mark: *Completed:* Restart device\n\nDevice restarted.",
+    ]
@@ -0,0 +1,46 @@
+"""Tests for agent tool helpers."""
+
+from src.agent import tools
+from src.agent.tools import cached_tool, clear_tool_cache
+
+
+async def test_cached_tool_serves_stale_on_error():
+    """Test that cached responses are reused and served when a refresh fails."""
+    calls = []
+
+    @cached_tool(0.0, "widgets")
+    async def get_widgets() -> str:
+        calls.append(1)
+        if len(calls) > 1:
+            raise RuntimeError("controller down")
+        return "2 widgets"
+
+    clear_tool_cache()
+    assert await get_widgets() == "2 widgets"
+    # Expired entry is refreshed, and the failure falls back to the stale value
+    assert await get_widgets() == "2 widgets"
+    assert len(calls) == 2
+
+    clear_tool_cache()
+    assert await get_widgets() == "Error fetching widgets: controller down"
+
+
+async def test_traffic_stats_aggregates_hourly_buckets(monkeypatch):
+    """Test that traffic totals and the client average cover every bucket."""
+
+    class FakeAPI:
+        async def get_hourly_site_stats(self, hours):
+            return [
+                {"wan-rx_bytes": 3 << 30, "wan-tx_bytes": 1 << 20, "bytes": 2048, "num_sta": 4},
+                {"wan-rx_bytes": 1 << 30, "num_sta": 6},
+            ]
+
+    monkeypatch.setattr(tools, "get_controller_api", FakeAPI)
+
+    assert await tools.get_traffic_stats(2) == (
+        "**Traffic Statistics** (Last 2 hours)\n"
+        "- WAN Download: 4.00 GB\n"
+        "- WAN Upload: 1024.00 KB\n"
+        "- Total LAN Traffic: 2.00 KB\n"
+        "- Average Connected Clients: 5.0"
+    )